@@ -9,36 +9,114 @@ except ImportError:
         create_agent = None
         create_tool_calling_agent = None
 
-from langchain.tools import tool
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.tools import StructuredTool
 from typing import Dict, Any, Optional
 from utils.llm_factory import get_llm
+import asyncio
 import json
 import os
+import re
+import threading
 from datetime import datetime
 
 
+# collect_contact_info needs an email, so messages without one skip extraction
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_CONTACT_FIELDS = ("name", "email", "phone", "interest", "message")
+# Shared by every FormAgent (one per model) appending to the same contacts file
+_CONTACTS_LOCK = threading.Lock()
+_EXTRACTION_PROMPT = """Extract the contact details from the message below. Reply with only a JSON object with the keys "name", "email", "phone", "interest" and "message" (null when missing), or reply NONE if the message does not give both a name and an email.
+
+Message: {message}"""
+
+
+def _parse_contact_args(text: str) -> Optional[Dict[str, str]]:
+    """Parse an extraction reply into collect_contact_info arguments, or None."""
+    match = _JSON_OBJECT_RE.search(text or "")
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not data.get("name") or not data.get("email"):
+        return None
+    return {key: str(data[key]) for key in _CONTACT_FIELDS if data.get(key)}
+
+
 class FormAgent:
     """Agent specialized in collecting and managing contact information."""
     
-    def __init__(self, model_name: str = None):
+    # Pre-JSONL storage, still read by get_contacts() so no contact is lost
+    LEGACY_CONTACTS_FILE = "contacts.json"
+    
+    def __init__(self, model_name: str = None, llm=None):
         """
         Initialize the form agent.
         
         Args:
             model_name: Name of the model to use
+            llm: Pre-built LLM to use instead of get_llm(model_name)
         """
-        self.llm = get_llm(model_name=model_name)
-        self.contacts_file = "contacts.json"
+        self.llm = llm if llm is not None else get_llm(model_name=model_name)
+        # Resolved model name reported in response metadata
+        self._model_name = getattr(self.llm, 'model', 'unknown')
+        # Contacts are appended as JSON Lines
+        self.contacts_file = "contacts.jsonl"
+        # Built once and reused by every call so the prompt prefix never changes
+        self._system_msg = SystemMessage(content=self._get_system_prompt())
         self.tool = self._create_form_tool()
         
         # Use SimpleAgent by default as it works with all LLMs including Ollama
         self.agent = self._create_simple_agent()
     
+    def _write_contact_sync(self, entry: Dict[str, Any]) -> None:
+        """Append a contact as one JSON line (on disk before the tool reports it saved)."""
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with _CONTACTS_LOCK:
+            with open(self.contacts_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+    
+    @staticmethod
+    def _build_contact(
+        name: str,
+        email: str,
+        phone: Optional[str] = None,
+        interest: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build a contact entry stamped with the current time."""
+        return {
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "interest": interest,
+            "message": message,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def acollect_contact_info(
+        self,
+        name: str,
+        email: str,
+        phone: Optional[str] = None,
+        interest: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> str:
+        """Save a contact without blocking the event loop (disk I/O runs in a thread)."""
+        try:
+            entry = self._build_contact(name, email, phone, interest, message)
+            await asyncio.to_thread(self._write_contact_sync, entry)
+            return f"Thank you {name}! Your contact information has been saved. We'll get back to you at {email} soon."
+        except Exception as e:
+            return f"Error saving contact information: {str(e)}"
+    
     def _create_form_tool(self):
         """Create the form collection tool."""
-        contacts_file_ref = self.contacts_file
+        agent_ref = self
         
-        @tool
         def collect_contact_info(
             name: str,
             email: str,
@@ -59,40 +137,26 @@ class FormAgent:
                 Confirmation message
             """
             try:
-                # Load existing contacts
-                contacts = []
-                if os.path.exists(contacts_file_ref):
-                    with open(contacts_file_ref, 'r', encoding='utf-8') as f:
-                        contacts = json.load(f)
-                
-                # Create new contact entry
-                new_contact = {
-                    "name": name,
-                    "email": email,
-                    "phone": phone,
-                    "interest": interest,
-                    "message": message,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                contacts.append(new_contact)
-                
-                # Save contacts
-                with open(contacts_file_ref, 'w', encoding='utf-8') as f:
-                    json.dump(contacts, f, indent=2, ensure_ascii=False)
+                # Append to the JSONL file (O(1) regardless of file size)
+                agent_ref._write_contact_sync(agent_ref._build_contact(name, email, phone, interest, message))
                 
                 return f"Thank you {name}! Your contact information has been saved. We'll get back to you at {email} soon."
                 
             except Exception as e:
                 return f"Error saving contact information: {str(e)}"
         
-        return collect_contact_info
+        # Sync and async implementations: tool.ainvoke() uses the non-blocking one
+        return StructuredTool.from_function(
+            func=collect_contact_info,
+            coroutine=agent_ref.acollect_contact_info,
+            name="collect_contact_info"
+        )
     
     def _create_simple_agent(self):
         """Create a simple agent when create_agent is not available."""
         tool_ref = self.tool
         llm_ref = self.llm
-        system_prompt = self._get_system_prompt()
+        system_msg_ref = self._system_msg
         
         class SimpleAgent:
             async def ainvoke(self, input_dict):
@@ -107,11 +171,22 @@ class FormAgent:
                     user_message = messages[-1].get("content", "") if isinstance(messages[-1], dict) else str(messages[-1])
                 
                 try:
-                    tool_result = tool_ref.invoke(user_message) if hasattr(tool_ref, 'invoke') else tool_ref(user_message)
+                    # Only save a contact when the message carries one: extract the
+                    # tool arguments first instead of calling the tool with raw text
+                    tool_result = "No contact information provided yet."
+                    if _EMAIL_RE.search(user_message):
+                        extraction = await llm_ref.ainvoke([
+                            HumanMessage(content=_EXTRACTION_PROMPT.format(message=user_message))
+                        ])
+                        contact_args = _parse_contact_args(
+                            extraction.content if hasattr(extraction, 'content') else str(extraction)
+                        )
+                        if contact_args:
+                            tool_result = await tool_ref.ainvoke(contact_args)
                     
-                    from langchain_core.messages import HumanMessage
                     prompt_messages = [
-                        HumanMessage(content=f"{system_prompt}\n\nUser query: {user_message}\n\nTool result: {tool_result}\n\nProvide a helpful answer:")
+                        system_msg_ref,
+                        HumanMessage(content=f"User query: {user_message}\n\nTool result: {tool_result}\n\nProvide a helpful answer:")
                     ]
                     
                     if hasattr(llm_ref, 'ainvoke'):
@@ -176,7 +251,7 @@ When a user wants to provide contact information, use the collect_contact_info t
                 "answer": answer,
                 "metadata": {
                     "agent": "form",
-                    "model": getattr(self.llm, 'model', 'unknown') if hasattr(self.llm, 'model') else "unknown"
+                    "model": self._model_name
                 }
             }
         except Exception as e:
@@ -191,10 +266,16 @@ When a user wants to provide contact information, use the collect_contact_info t
     def get_contacts(self) -> list:
         """Get all collected contacts."""
         try:
+            contacts = []
+            if os.path.exists(self.LEGACY_CONTACTS_FILE):
+                with open(self.LEGACY_CONTACTS_FILE, 'r', encoding='utf-8') as f:
+                    contacts.extend(json.load(f))
             if os.path.exists(self.contacts_file):
                 with open(self.contacts_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+                    for line in f:
+                        if line.strip():
+                            contacts.append(json.loads(line))
+            return contacts
         except Exception as e:
             print(f"Error reading contacts: {e}")
             return []
@@ -1,6 +1,10 @@
 """Orchestration agent that coordinates multiple specialized agents."""
 import asyncio
 import logging
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 try:
     from langchain.agents import create_agent
 except ImportError:
@@ -15,15 +19,62 @@ try:
     from langchain_core.prompts import ChatPromptTemplate
 except ImportError:
     from langchain.prompts import ChatPromptTemplate
-from typing import Dict, Any
+from typing import Dict, Any, List
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from config import settings
 from utils.llm_factory import get_llm
-from agents.retrieval_agent import RetrievalAgent
-from agents.web_scraper_agent import WebScraperAgent
-from agents.form_agent import FormAgent
+from utils.semantic_cache import SemanticCache
+from agents.registry import get_retrieval_agent, get_web_scraper_agent, get_form_agent
+from agents.retrieval_agent import NO_DOCS_ANSWER
+
+# Optional: pyahocorasick matches all routing keywords in one pass over the query
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
+# Routing keywords (matched as substrings of the lowercased query)
+_FORM_KWS = frozenset({"contact", "register", "sign up", "email", "phone", "follow-up"})
+_NEWS_KWS = frozenset({"news", "update", "latest", "recent", "event"})
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile a keyword set into a single alternation regex (longest first)."""
+    return re.compile("|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)))
+
+
+_FORM_RE = _keyword_pattern(_FORM_KWS)
+_NEWS_RE = _keyword_pattern(_NEWS_KWS)
+
+# Keyword-routed sub-agents (orchestrator attribute, keywords, pattern); every match is dispatched
+_INTENT_ROUTES = (
+    ("form_agent", _FORM_KWS, _FORM_RE),
+    ("web_scraper_agent", _NEWS_KWS, _NEWS_RE),
+)
+
+
+def _build_intent_automaton():
+    """Build an Aho-Corasick automaton mapping every routing keyword to its agent."""
+    automaton = ahocorasick.Automaton()
+    for name, keywords, _ in _INTENT_ROUTES:
+        for keyword in keywords:
+            automaton.add_word(keyword, name)
+    automaton.make_automaton()
+    return automaton
+
+
+_INTENT_AUTOMATON = _build_intent_automaton() if AHOCORASICK_AVAILABLE else None
+# Separator between answers of sub-agents dispatched for the same query
+_ANSWER_SEPARATOR = "\n\n---\n\n"
+# Only the most recent history messages are replayed into the agent input
+_MAX_HISTORY_MESSAGES = 20
+# Error/fallback answers produced by the agents, never stored in the semantic cache
+_UNCACHEABLE_ANSWER_PREFIXES = ("Error:", "Erreur", "I encountered an error", "I received an empty response", NO_DOCS_ANSWER)
+
 class OrchestratorAgent:
     """Orchestrates multiple agents to handle complex queries."""
     
@@ -34,10 +85,18 @@ class OrchestratorAgent:
         Args:
             model_name: Name of the model to use
         """
+        # Build the shared LLM first so the sub-agents hit the get_llm cache,
+        # then fetch the shared sub-agents concurrently (first creation is I/O-bound)
         self.llm = get_llm(model_name=model_name)
-        self.retrieval_agent = RetrievalAgent(model_name=model_name)
-        self.web_scraper_agent = WebScraperAgent(model_name=model_name)
-        self.form_agent = FormAgent(model_name=model_name)
+        # Resolved model name reported in response metadata
+        self._model_name = getattr(self.llm, 'model', 'unknown')
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            retrieval_future = executor.submit(get_retrieval_agent, model_name)
+            web_scraper_future = executor.submit(get_web_scraper_agent, model_name)
+            form_future = executor.submit(get_form_agent, model_name)
+        self.retrieval_agent = retrieval_future.result()
+        self.web_scraper_agent = web_scraper_future.result()
+        self.form_agent = form_future.result()
         
         # Define tools for the orchestrator
         self.tools = [
@@ -46,6 +105,20 @@ class OrchestratorAgent:
             self.form_agent.get_tool(),
         ]
         
+        # Semantic cache of final answers for history-less retrieval queries
+        self._semantic_cache = None
+        self._semantic_cache_generation = 0
+        if settings.semantic_cache_enabled:
+            self._semantic_cache = SemanticCache(
+                self.retrieval_agent.vector_store.embeddings,
+                threshold=settings.semantic_cache_threshold,
+                max_entries=settings.semantic_cache_max_entries,
+                ttl_seconds=settings.semantic_cache_ttl_seconds
+            )
+        
+        # Built once and shared with the agent so the prompt prefix never changes
+        self._system_prompt_str = self._get_system_prompt()
+        
         # Create the orchestrator agent
         # Use SimpleAgent by default as it works with all LLMs including Ollama
         # create_tool_calling_agent requires bind_tools which Ollama models don't support
@@ -55,6 +128,41 @@ class OrchestratorAgent:
         """Get the system prompt for the orchestrator."""
         return """Assistant ESILV. Coordonne les agents pour répondre aux questions sur les programmes, admissions et informations ESILV. Utilise retrieval_agent pour la documentation, web_scraper_agent pour les actualités, form_agent pour les contacts. Réponds en français."""
     
+    @staticmethod
+    def _match_intents(q: str) -> list:
+        """Return the names of the keyword-routed sub-agents matching a lowercased query."""
+        if _INTENT_AUTOMATON is not None:
+            matched = set()
+            for _, name in _INTENT_AUTOMATON.iter(q):
+                matched.add(name)
+                if len(matched) == len(_INTENT_ROUTES):
+                    break  # every route already hit, no need to scan the rest
+            return [name for name, _, _ in _INTENT_ROUTES if name in matched]
+        # Fallback: one compiled alternation regex per route
+        return [name for name, _, pattern in _INTENT_ROUTES if pattern.search(q)]
+    
+    def _build_messages(self, query: str, conversation_history: list = None) -> list:
+        """
+        Build the structured message list for the agent.
+        
+        The system prompt comes first and never changes, followed by the last
+        _MAX_HISTORY_MESSAGES history turns, so the prompt prefix stays stable
+        across turns for backends with prefix/KV caching.
+        
+        Args:
+            query: User's query
+            conversation_history: Previous conversation messages ({"role", "content"} dicts)
+        
+        Returns:
+            List of LangChain messages ending with the user's query
+        """
+        messages = [SystemMessage(content=self._system_prompt_str)]
+        for msg in (conversation_history or [])[-_MAX_HISTORY_MESSAGES:]:
+            message_cls = AIMessage if msg.get("role") == "assistant" else HumanMessage
+            messages.append(message_cls(content=msg.get("content", "")))
+        messages.append(HumanMessage(content=query))
+        return messages
+    
     def _create_simple_agent(self):
         """Create a simple agent wrapper when create_agent is not available."""
         orchestrator_ref = self
@@ -62,7 +170,7 @@ class OrchestratorAgent:
         class SimpleAgent:
             def __init__(self, llm, tools, system_prompt):
                 self.llm = llm
-                self.tools = {tool.name: tool for tool in tools if hasattr(tool, 'name')}
+                self.tools = {name: tool for tool in tools if (name := getattr(tool, 'name', None))}
                 self.system_prompt = system_prompt
             
             async def ainvoke(self, input_dict):
@@ -74,36 +182,38 @@ class OrchestratorAgent:
                     messages = input_dict.get("messages", [])
                     if not messages:
                         return {"output": ""}
-                    user_message = messages[-1].get("content", "") if isinstance(messages[-1], dict) else str(messages[-1])
+                    last_message = messages[-1]
+                    user_message = last_message.get("content", "") if isinstance(last_message, dict) else getattr(last_message, "content", str(last_message))
                 
                 # Try to use tools based on query
-                query_lower = user_message.lower()
+                q = user_message.lower()
                 result = ""
                 
-                # Route to appropriate agent
-                import logging
-                logger = logging.getLogger(__name__)
-                
-                if any(word in query_lower for word in ["contact", "register", "sign up", "email", "phone", "follow-up"]):
-                    # Use form agent
-                    logger.info("Routing to form_agent")
-                    form_result = await orchestrator_ref.form_agent.process_query(user_message)
-                    result = form_result.get("answer", "")
-                elif any(word in query_lower for word in ["news", "update", "latest", "recent", "event"]):
-                    # Use web scraper agent
-                    logger.info("Routing to web_scraper_agent")
-                    scraper_result = await orchestrator_ref.web_scraper_agent.process_query(user_message)
-                    result = scraper_result.get("answer", "")
+                # Route to every matching agent, running them concurrently
+                intents = orchestrator_ref._match_intents(q)
+                if intents:
+                    logger.info("Routing to %s", ", ".join(intents))
+                    agent_results = await asyncio.gather(
+                        *(getattr(orchestrator_ref, name).process_query(user_message) for name in intents),
+                        return_exceptions=True
+                    )
+                    answers = []
+                    for name, agent_result in zip(intents, agent_results):
+                        if isinstance(agent_result, Exception):
+                            logger.error(f"{name} failed: {agent_result}")
+                        elif agent_result.get("answer"):
+                            answers.append(agent_result["answer"])
+                    result = _ANSWER_SEPARATOR.join(answers)
                 else:
                     # Use retrieval agent by default
                     logger.info("Routing to retrieval_agent (default)")
                     retrieval_result = await orchestrator_ref.retrieval_agent.process_query(user_message)
                     result = retrieval_result.get("answer", "")
-                    logger.info(f"Retrieval agent returned answer (length: {len(result) if result else 0})")
+                    logger.debug("Retrieval agent returned answer (length: %d)", len(result) if result else 0)
                 
                 return {"output": result}
         
-        return SimpleAgent(self.llm, self.tools, self._get_system_prompt())
+        return SimpleAgent(self.llm, self.tools, self._system_prompt_str)
     
     async def process_query(
         self,
@@ -120,46 +230,50 @@ class OrchestratorAgent:
         Returns:
             Response dictionary with answer and metadata
         """
-        import time
         start_time = time.time()
         
-        logger.info("=" * 70)
-        logger.info("DEBUG: ========== ORCHESTRATOR.process_query() ==========")
-        logger.info(f"DEBUG: Query: {query[:100]}")
-        logger.info(f"DEBUG: History length: {len(conversation_history) if conversation_history else 0}")
-        logger.info("=" * 70)
-        
-        messages = conversation_history or []
-        messages.append({"role": "user", "content": query})
+        logger.debug("ORCHESTRATOR.process_query() query=%r history=%d",
+                     query[:100], len(conversation_history) if conversation_history else 0)
         
         try:
-            # Convert conversation history to input format
-            logger.info("DEBUG: Converting conversation history...")
-            input_text = query
-            if conversation_history:
-                # Build context from history
-                history_text = "\n".join([
-                    f"{msg.get('role', 'user')}: {msg.get('content', '')}"
-                    for msg in conversation_history[:-1]  # Exclude current query
-                ])
-                if history_text:
-                    input_text = f"{history_text}\nuser: {query}"
+            # Answers that only depend on the documentation can be served from the
+            # semantic cache; routed intents (contacts, news) and follow-ups cannot
+            cache_vector = None
+            if (
+                self._semantic_cache is not None
+                and not conversation_history
+                and not self._match_intents(query.lower())
+            ):
+                generation = getattr(self.retrieval_agent.vector_store, "generation", 0)
+                if generation != self._semantic_cache_generation:
+                    self._semantic_cache.clear()
+                    self._semantic_cache_generation = generation
+                norm_query = " ".join(query.lower().split())
+                # Exact repeats skip the embedding call
+                cached = self._semantic_cache.lookup_text(norm_query)
+                if cached is None:
+                    cache_vector = await asyncio.to_thread(self._semantic_cache.embed, norm_query)
+                    cached = self._semantic_cache.lookup(cache_vector)
+                if cached is not None:
+                    logger.info("ORCHESTRATOR.process_query() served from semantic cache")
+                    return {"answer": cached["answer"], "metadata": {**cached["metadata"], "cached": True}}
+            
+            # Structured messages (system prompt, bounded history, query); routing and
+            # sub-agents only see the query itself, not a flattened history string
+            messages = self._build_messages(query, conversation_history)
             
-            logger.info("DEBUG: Invoking agent...")
             agent_start = time.time()
             # Invoke agent with proper format
-            response = await self.agent.ainvoke({"input": input_text})
+            response = await self.agent.ainvoke({"messages": messages})
             agent_time = time.time() - agent_start
-            logger.info(f"DEBUG: ✅ Agent invoked in {agent_time:.2f}s")
-            logger.info(f"DEBUG: Response type: {type(response)}")
+            logger.debug("Agent invoked in %.2fs (response type: %s)", agent_time, type(response).__name__)
             
             # Extract answer from response
-            logger.info("DEBUG: Extracting answer from response...")
             answer = ""
             if isinstance(response, dict):
                 # AgentExecutor returns {"output": "..."}
                 answer = response.get("output", "")
-                logger.info(f"DEBUG: Got answer from 'output' key: {len(answer)} chars")
+                logger.debug("Got answer from 'output' key: %d chars", len(answer))
                 if not answer:
                     # Fallback: try to get from messages if present
                     messages_list = response.get("messages", [])
@@ -169,39 +283,34 @@ class OrchestratorAgent:
                             answer = last_msg.get("content", "")
                         else:
                             answer = str(last_msg)
-                        logger.info(f"DEBUG: Got answer from messages: {len(answer)} chars")
+                        logger.debug("Got answer from messages: %d chars", len(answer))
             else:
                 answer = str(response)
-                logger.info(f"DEBUG: Got answer from string conversion: {len(answer)} chars")
+                logger.debug("Got answer from string conversion: %d chars", len(answer))
             
             if not answer:
-                logger.warning("DEBUG: ⚠️ Empty answer, using default message")
+                logger.warning("Empty answer, using default message")
                 answer = "I received an empty response. Please try again."
             
             total_time = time.time() - start_time
-            logger.info("=" * 70)
-            logger.info(f"DEBUG: ✅ ORCHESTRATOR.process_query() COMPLETED in {total_time:.2f}s")
-            logger.info(f"DEBUG: Answer length: {len(answer)} chars")
-            logger.info("=" * 70)
+            logger.info("ORCHESTRATOR.process_query() completed in %.2fs (%d chars)", total_time, len(answer))
             
-            return {
+            result = {
                 "answer": answer,
                 "metadata": {
                     "agent": "orchestrator",
                     "tools_used": response.get("intermediate_steps", []) if isinstance(response, dict) else [],
-                    "model": getattr(self.llm, 'model', 'unknown') if hasattr(self.llm, 'model') else "unknown"
+                    "model": self._model_name
                 }
             }
+            if cache_vector is not None and not answer.startswith(_UNCACHEABLE_ANSWER_PREFIXES):
+                self._semantic_cache.add(cache_vector, result, norm_query)
+            return result
         except Exception as e:
-            import traceback
             total_time = time.time() - start_time
             error_details = traceback.format_exc()
-            logger.error("=" * 70)
-            logger.error(f"DEBUG: ❌❌❌ ERROR in ORCHESTRATOR.process_query() after {total_time:.2f}s")
-            logger.error(f"DEBUG: Error: {str(e)}")
-            logger.error(f"DEBUG: Error type: {type(e)}")
-            logger.error(f"DEBUG: Full traceback:\n{error_details}")
-            logger.error("=" * 70)
+            logger.error("ERROR in ORCHESTRATOR.process_query() after %.2fs: %s (%s)\n%s",
+                         total_time, e, type(e).__name__, error_details)
             return {
                 "answer": f"I encountered an error processing your query: {str(e)}",
                 "metadata": {
@@ -211,6 +320,33 @@ class OrchestratorAgent:
                 }
             }
     
+    async def process_queries(
+        self,
+        queries: List[str],
+        max_concurrency: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several independent queries concurrently.
+        
+        Each query goes through process_query (routing included); at most
+        max_concurrency of them are in flight at once so the LLM backend is
+        not flooded.
+        
+        Args:
+            queries: User queries, without conversation history
+            max_concurrency: Maximum number of queries processed at the same time
+        
+        Returns:
+            Response dictionaries, in the same order as queries
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _run(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_query(query)
+        
+        return await asyncio.gather(*(_run(query) for query in queries))
+    
     async def process_query_stream(
         self,
         query: str,
@@ -226,109 +362,66 @@ class OrchestratorAgent:
         Yields:
             Chunks of the response as they are generated
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        messages = conversation_history or []
-        messages.append({"role": "user", "content": query})
-        
         try:
             # Determine which agent to use
-            query_lower = query.lower()
+            q = query.lower()
             
-            # Route to appropriate agent and stream response
-            if any(word in query_lower for word in ["contact", "register", "sign up", "email", "phone", "follow-up"]):
-                logger.info("Streaming: Routing to form_agent")
-                form_result = await self.form_agent.process_query(query)
-                answer = form_result.get("answer", "")
-                # Stream in chunks
-                chunk_size = 50
-                for i in range(0, len(answer), chunk_size):
-                    yield {"type": "chunk", "content": answer[i:i + chunk_size]}
-            elif any(word in query_lower for word in ["news", "update", "latest", "recent", "event"]):
-                logger.info("Streaming: Routing to web_scraper_agent")
-                scraper_result = await self.web_scraper_agent.process_query(query)
-                answer = scraper_result.get("answer", "")
-                chunk_size = 50
-                for i in range(0, len(answer), chunk_size):
-                    yield {"type": "chunk", "content": answer[i:i + chunk_size]}
+            # Route to every matching agent and stream answers as each one completes
+            intents = self._match_intents(q)
+            single_agent = getattr(self, intents[0]) if len(intents) == 1 else None
+            if single_agent is not None and hasattr(single_agent, "process_query_stream"):
+                # A single routed agent that can stream: forward its tokens as they arrive
+                logger.info("Streaming: Routing to %s (token stream)", intents[0])
+                async for text in single_agent.process_query_stream(query):
+                    yield {"type": "chunk", "content": text}
+            elif intents:
+                logger.info("Streaming: Routing to %s", ", ".join(intents))
+                tasks = [asyncio.ensure_future(getattr(self, name).process_query(query)) for name in intents]
+                try:
+                    first_answer = True
+                    for next_done in asyncio.as_completed(tasks):
+                        try:
+                            agent_result = await next_done
+                        except Exception as agent_error:
+                            logger.error(f"Streaming: sub-agent failed: {agent_error}")
+                            continue
+                        answer = agent_result.get("answer", "")
+                        if not answer:
+                            continue
+                        if not first_answer:
+                            yield {"type": "chunk", "content": _ANSWER_SEPARATOR}
+                        first_answer = False
+                        # Stream in chunks; long answers yield to the event loop between
+                        # chunks (no delay) so other streams are not starved
+                        chunk_size = 50
+                        cooperative = len(answer) > 5000
+                        for i in range(0, len(answer), chunk_size):
+                            yield {"type": "chunk", "content": answer[i:i + chunk_size]}
+                            if cooperative:
+                                await asyncio.sleep(0)
+                finally:
+                    for task in tasks:
+                        task.cancel()
             else:
                 # Use retrieval agent by default - this can use streaming LLM
                 logger.info("Streaming: Routing to retrieval_agent (default)")
                 
-                # Use streaming LLM if available
-                from langchain_core.messages import HumanMessage, SystemMessage
-                
-                # Get context from retrieval agent (synchronous call for speed)
-                # The retrieval agent now handles k dynamically based on query type
-                # No need to override k here - let the agent decide
-                tool_result = self.retrieval_agent.tool.invoke(query)
-                
-                # Build prompt following LangChain RAG best practices - ULTRA STRICT format
-                if tool_result and "Aucune documentation" not in tool_result and "collection est vide" not in tool_result:
-                    # Check if user wants detailed answer
-                    query_lower = query.lower()
-                    wants_details = any(word in query_lower for word in [
-                        "détails", "détail", "explique", "expliquer", "développe", "développer",
-                        "plus d'infos", "plus d'informations", "en détail", "en profondeur",
-                        "complètement", "complet", "tout", "tous", "liste", "lister"
-                    ])
-                    
-                    # Ultra-minimal prompt for better output quality
-                    prompt = f"""Assistant ESILV - Réponds aux questions sur les programmes, admissions et informations ESILV.
-
-Contexte:
-{tool_result}
-
-Question: {query}
-
-Réponds en français en utilisant uniquement le contexte ci-dessus. Si l'information n'est pas dans le contexte, dis: "Information non trouvée dans la documentation ESILV."
-
-Réponse:"""
-                else:
-                    prompt = f"""Assistant ESILV.
-
-Question: {query}
-
-Aucune information trouvée dans la documentation. Réponds en français avec tes connaissances générales sur ESILV.
-
-Réponse:"""
-                
-                # Generate response (no streaming for simplicity)
-                yield {"type": "metadata", "data": {"agent": "retrieval", "model": getattr(self.llm, 'model', 'unknown')}}
-                
+                # Same retrieval + prompt as the retrieval agent (streams tokens as the LLM produces them)
+                _, model_label = self.retrieval_agent.select_llm(query)
+                yield {"type": "metadata", "data": {"agent": "retrieval", "model": model_label}}
                 try:
-                    # Log the context to verify it's being passed
-                    logger.info(f"DEBUG: Context length: {len(tool_result) if tool_result else 0}")
-                    logger.info(f"DEBUG: Context preview (first 500 chars): {tool_result[:500] if tool_result else 'None'}")
-                    
-                    # Put EVERYTHING in a single HumanMessage to force the model to read it
-                    # Some models ignore SystemMessage, so we put everything in the user message
-                    full_prompt = prompt  # prompt already contains context + question
-                    messages = [HumanMessage(content=full_prompt)]
-                    
-                    logger.info(f"DEBUG: Sending {len(messages)} messages to LLM")
-                    logger.info(f"DEBUG: First message length: {len(full_prompt)}")
-                    
-                    result = await self.llm.ainvoke(messages)
-                    answer = result.content if hasattr(result, 'content') else str(result)
-                    
-                    logger.info(f"DEBUG: Received answer length: {len(answer)}")
-                    logger.info(f"DEBUG: Answer preview (first 200 chars): {answer[:200]}")
-                    
-                    # Stream the complete answer in chunks for frontend compatibility
-                    chunk_size = 50
-                    for i in range(0, len(answer), chunk_size):
-                        yield {"type": "chunk", "content": answer[i:i + chunk_size]}
-                        await asyncio.sleep(0.01)  # Small delay for smooth streaming
+                    answer_length = 0
+                    async for text in self.retrieval_agent.process_query_stream(query):
+                        answer_length += len(text)
+                        yield {"type": "chunk", "content": text}
+                    logger.debug("Streamed answer length: %d", answer_length)
                 except Exception as gen_error:
-                    logger.error(f"Error in generation: {gen_error}")
+                    logger.error("Error in generation: %s", gen_error)
                     yield {"type": "error", "error": f"Erreur lors de la generation: {str(gen_error)}"}
             
             yield {"type": "done"}
             
         except Exception as e:
-            import traceback
             logger.error(f"Error in streaming query: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             yield {"type": "error", "error": f"I encountered an error processing your query: {str(e)}"}
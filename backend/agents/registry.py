@@ -0,0 +1,46 @@
+"""Shared agent instances, one per agent type and model."""
+import functools
+from typing import Optional
+
+from config import settings
+from agents.retrieval_agent import RetrievalAgent
+from agents.web_scraper_agent import WebScraperAgent
+from agents.form_agent import FormAgent
+
+# Models with live agents; older ones are dropped (the chat API bounds its orchestrators too)
+_MAX_MODELS = 4
+
+
+def _resolve(model_name: Optional[str]) -> str:
+    """Map None to the default model so both spellings share an instance."""
+    return model_name or settings.ollama_default_model
+
+
+@functools.lru_cache(maxsize=_MAX_MODELS)
+def _retrieval_agent(model_name: str) -> RetrievalAgent:
+    return RetrievalAgent(model_name=model_name)
+
+
+@functools.lru_cache(maxsize=_MAX_MODELS)
+def _web_scraper_agent(model_name: str) -> WebScraperAgent:
+    return WebScraperAgent(model_name=model_name)
+
+
+@functools.lru_cache(maxsize=_MAX_MODELS)
+def _form_agent(model_name: str) -> FormAgent:
+    return FormAgent(model_name=model_name)
+
+
+def get_retrieval_agent(model_name: Optional[str] = None) -> RetrievalAgent:
+    """Get the shared RetrievalAgent for a model (created on first use)."""
+    return _retrieval_agent(_resolve(model_name))
+
+
+def get_web_scraper_agent(model_name: Optional[str] = None) -> WebScraperAgent:
+    """Get the shared WebScraperAgent for a model (created on first use)."""
+    return _web_scraper_agent(_resolve(model_name))
+
+
+def get_form_agent(model_name: Optional[str] = None) -> FormAgent:
+    """Get the shared FormAgent for a model (created on first use)."""
+    return _form_agent(_resolve(model_name))
@@ -1,4 +1,12 @@
 """Retrieval agent for RAG queries."""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import traceback
+from collections import OrderedDict
 try:
     from langchain.agents import create_agent
 except ImportError:
@@ -14,28 +22,90 @@ try:
     from langchain_core.prompts import ChatPromptTemplate
 except ImportError:
     from langchain.prompts import ChatPromptTemplate
-from typing import Dict, Any
-from utils.llm_factory import get_llm
+from typing import Dict, Any, AsyncIterator, Optional
+from langchain_core.messages import HumanMessage
+from utils.llm_factory import get_llm, needs_reasoning_model, get_model_context_window, estimate_tokens
 from rag.vector_store import vector_store
 
+logger = logging.getLogger(__name__)
+
+# Cues that the user wants a detailed answer (same substrings as the old keyword list)
+_DETAIL_RE = re.compile(
+    r"détail|explique|développe|plus d'info(?:s|rmations)|en profondeur"
+    r"|complètement|complet|tout|tous|liste"
+)
+
+# search_documentation results meaning nothing usable was retrieved
+_NO_DOCS_MARKERS = ("Aucune documentation", "collection est vide")
+NO_DOCS_ANSWER = "Information non trouvée dans la documentation ESILV."
+
+# RAG prompt. The stable part (instructions + retrieved context) always comes
+# first and is byte-identical across turns, so backends with prompt-prefix
+# caching (Ollama's KV cache, Gemini/OpenAI prefix caches) can reuse it; only
+# the question and answer cue vary.
+_RAG_PROMPT_PREFIX = """Assistant ESILV - Réponds aux questions sur les programmes, admissions et informations ESILV.
+
+Contexte:
+{context}
+
+"""
+_RAG_PROMPT_SUFFIX = """Question: {query}
+
+Réponds en français en utilisant uniquement le contexte ci-dessus. Si l'information n'est pas dans le contexte, dis: "{no_docs_answer}"
+
+Réponse:"""
+
+# Max cached search results per agent
+_SEARCH_CACHE_SIZE = 1024
+
+
+def no_docs_answer(tool_result: str) -> Optional[str]:
+    """
+    Return the answer to give directly when retrieval found nothing.
+    
+    Args:
+        tool_result: Output of the search_documentation tool
+    
+    Returns:
+        Canned answer (no LLM call needed), or None when documents were found
+    """
+    if tool_result and not any(marker in tool_result for marker in _NO_DOCS_MARKERS):
+        return None
+    if tool_result and "collection est vide" in tool_result:
+        return tool_result  # already user-facing: explains how to index documents
+    return NO_DOCS_ANSWER
+
+
+# Cleanup of stringified message objects ("content='...' role='assistant' thinking=None ...")
+_CONTENT_RE = re.compile(r"content=['\"](.*?)['\"]", re.DOTALL)
+_MESSAGE_METADATA_RE = re.compile(r"role=['\"][^'\"]*['\"]\s*|(?:thinking|images|tool_name|tool_calls)=None\s*")
+
 
 class RetrievalAgent:
     """Agent specialized in retrieval-augmented generation."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm=None):
         """
         Initialize the retrieval agent with model-aware context management.
         
         Args:
             model_name: Name of the model to use
+            llm: Pre-built LLM to use instead of get_llm(model_name)
         """
-        from utils.llm_factory import get_model_context_window
         self.model_name = model_name
         self.context_window = get_model_context_window(model_name or "llama3")
         logger.info(f"RetrievalAgent initialized with model '{model_name or 'default'}' - Context window: {self.context_window:,} tokens")
         
-        self.llm = get_llm(model_name=model_name)
+        self.llm = llm if llm is not None else get_llm(model_name=model_name)
+        # Small model for plain "extract + rephrase" answers (same as self.llm if not configured)
+        self.light_llm = get_llm(model_name=model_name, role="light")
+        # Resolved model names reported in response metadata
+        self._model_name = getattr(self.llm, 'model', 'unknown')
+        self._light_model_name = getattr(self.light_llm, 'model', 'unknown')
         self.vector_store = vector_store
+        # LRU cache of search results, keyed by (normalized query, vector store generation)
+        self._search_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._search_cache_lock = threading.Lock()
         self.tool = self._create_retrieval_tool()
         
         # Use SimpleAgent by default as it works with all LLMs including Ollama
@@ -44,21 +114,10 @@ class RetrievalAgent:
     def _create_retrieval_tool(self):
         """Create the retrieval tool."""
         vector_store_ref = self.vector_store
+        agent_ref = self
         
-        @tool
-        def search_documentation(query: str) -> str:
-            """Recherche la documentation ESILV pour des informations sur les programmes, admissions, cours et politiques.
-            
-            Args:
-                query: La requête de recherche sur les programmes ESILV, admissions, cours, etc.
-            
-            Returns:
-                Extraits de documentation pertinents avec citations [source:file#chunk]
-            """
-            import os
-            import logging
-            logger = logging.getLogger(__name__)
-            
+        def run_search(query: str) -> str:
+            """Uncached documentation search (callers go through search())."""
             try:
                 # Try to search directly - don't rely on get_collection_info() which may timeout
                 # The similarity_search will handle empty collections gracefully
@@ -71,11 +130,7 @@ class RetrievalAgent:
                 query_lower = query.lower()
                 
                 # Check if user wants detailed answer
-                wants_details = any(word in query_lower for word in [
-                    "détails", "détail", "explique", "expliquer", "développe", "développer",
-                    "plus d'infos", "plus d'informations", "en détail", "en profondeur",
-                    "complètement", "complet", "tout", "tous", "liste", "lister"
-                ])
+                wants_details = bool(_DETAIL_RE.search(query_lower))
                 
                 # Enhanced k for better retrieval - increase for specific queries
                 # Use larger k initially, then rerank to top results
@@ -210,7 +265,6 @@ class RetrievalAgent:
                 
                 # Adaptive max_docs based on model context window
                 # Calculate how many documents we can fit in the available context
-                from utils.llm_factory import estimate_tokens
                 
                 # Reserve tokens for prompt, query, and response
                 reserved_tokens = 2000
@@ -255,7 +309,7 @@ class RetrievalAgent:
                     logger.warning("DEBUG: ⚠️ No documents found in similarity_search - collection may be empty or query not relevant")
                     # Try to verify if collection is actually empty
                     try:
-                        collection = vector_store_ref.client.get_collection(name=vector_store_ref.collection_name)
+                        collection = vector_store_ref.collection
                         sample = collection.get(limit=1)
                         if sample and "ids" in sample and len(sample["ids"]) > 0:
                             logger.info("DEBUG: Collection has documents but similarity_search returned nothing - query may not be relevant")
@@ -304,7 +358,6 @@ class RetrievalAgent:
                             if isinstance(images_raw, str):
                                 # Decode JSON string
                                 try:
-                                    import json
                                     images = json.loads(images_raw) if images_raw else []
                                 except (json.JSONDecodeError, TypeError):
                                     images = []
@@ -359,7 +412,6 @@ Contenu:
                 formatted_context = "\n\n".join(context_blocks)
                 
                 # Adaptive context truncation based on model context window
-                from utils.llm_factory import estimate_tokens
                 
                 # Reserve tokens for: system prompt (~200), user query (~100), response (~1000), safety margin (~500)
                 reserved_tokens = 1800
@@ -403,29 +455,105 @@ Contenu:
                 
                 return formatted_context
             except Exception as e:
-                import traceback
                 logger.error(f"Error in search_documentation: {str(e)}")
                 logger.error(f"Traceback: {traceback.format_exc()}")
                 return "Aucune documentation pertinente trouvée dans la base de connaissances. Vous pouvez utiliser vos connaissances générales pour répondre à la question."
         
+        self._run_search = run_search
+        
+        @tool
+        def search_documentation(query: str) -> str:
+            """Recherche la documentation ESILV pour des informations sur les programmes, admissions, cours et politiques.
+            
+            Args:
+                query: La requête de recherche sur les programmes ESILV, admissions, cours, etc.
+            
+            Returns:
+                Extraits de documentation pertinents avec citations [source:file#chunk]
+            """
+            return agent_ref.search(query)
+        
         return search_documentation
     
+    def search(self, query: str) -> str:
+        """
+        Search the documentation, reusing the context of an identical earlier query.
+        
+        Queries are normalized (case and whitespace) before lookup. Entries are
+        keyed on the vector store generation, so any document write invalidates
+        them; "no documentation" results are not cached.
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Formatted documentation context
+        """
+        norm_query = " ".join(query.lower().split())
+        key = (norm_query, getattr(self.vector_store, "generation", 0))
+        with self._search_cache_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None:
+                self._search_cache.move_to_end(key)
+                logger.debug("Retrieval cache hit for %r", norm_query[:100])
+                return cached
+        
+        # The normalized text only keys the cache; the search sees the query as typed
+        result = self._run_search(query)
+        if result and not result.startswith("Aucune documentation"):
+            with self._search_cache_lock:
+                self._search_cache[key] = result
+                if len(self._search_cache) > _SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+        return result
+    
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the retrieval agent."""
         return """Assistant ESILV. Réponds aux questions sur les programmes, admissions et informations ESILV."""
     
+    @staticmethod
+    def _build_prompt(query: str, tool_result: str) -> str:
+        """
+        Build the RAG prompt for a query and the retrieved context.
+        
+        Args:
+            query: User's query
+            tool_result: Output of the search_documentation tool (documents found)
+        
+        Returns:
+            Prompt text (a single HumanMessage works best across models)
+        """
+        # Ultra-minimal prompt for better output quality (cacheable prefix first)
+        return (
+            _RAG_PROMPT_PREFIX.format(context=tool_result)
+            + _RAG_PROMPT_SUFFIX.format(query=query, no_docs_answer=NO_DOCS_ANSWER)
+        )
+    
+    def select_llm(self, query: str):
+        """
+        Pick the model that answers a query.
+        
+        Args:
+            query: User's query
+        
+        Returns:
+            (llm, model name) - the light model unless the query needs reasoning
+        """
+        if needs_reasoning_model(query):
+            return self.llm, self._model_name
+        return self.light_llm, self._light_model_name
+    
     def _create_simple_agent(self):
         """Create a simple agent when create_agent is not available."""
         tool_ref = self.tool
-        llm_ref = self.llm
+        heavy_llm_ref = self.llm
+        light_llm_ref = self.light_llm
+        build_prompt = self._build_prompt
         system_prompt = self._get_system_prompt()
         
         class SimpleAgent:
             async def ainvoke(self, input_dict):
                 """Invoke the agent."""
-                import logging
-                logger = logging.getLogger(__name__)
-                
                 # Support both {"input": "..."} and {"messages": [...]} formats
                 if "input" in input_dict:
                     user_message = input_dict["input"]
@@ -446,39 +574,14 @@ Contenu:
                     logger.info(f"DEBUG: Tool result preview (first 500 chars): {str(tool_result)[:500]}")
                     logger.info("DEBUG: ==============================================")
                     
-                    # Build RAG prompt with context (as shown in the notebook)
-                    from langchain_core.messages import HumanMessage
+                    # Nothing retrieved: answer directly, an LLM round-trip adds nothing
+                    canned = no_docs_answer(tool_result)
+                    if canned is not None:
+                        return {"output": canned}
                     
+                    # Build RAG prompt with context (as shown in the notebook)
                     # Build prompt following LangChain RAG best practices - simple and clear
-                    if tool_result and "Aucune documentation" not in tool_result and "collection est vide" not in tool_result:
-                        # Check if user wants detailed answer
-                        query_lower = user_message.lower()
-                        wants_details = any(word in query_lower for word in [
-                            "détails", "détail", "explique", "expliquer", "développe", "développer",
-                            "plus d'infos", "plus d'informations", "en détail", "en profondeur",
-                            "complètement", "complet", "tout", "tous", "liste", "lister"
-                        ])
-                        
-                        # Ultra-minimal prompt for better output quality
-                        prompt = f"""Assistant ESILV - Réponds aux questions sur les programmes, admissions et informations ESILV.
-
-Contexte:
-{tool_result}
-
-Question: {user_message}
-
-Réponds en français en utilisant uniquement le contexte ci-dessus. Si l'information n'est pas dans le contexte, dis: "Information non trouvée dans la documentation ESILV."
-
-Réponse:"""
-                    else:
-                        # No context found - minimal prompt
-                        prompt = f"""Assistant ESILV.
-
-Question: {user_message}
-
-Aucune information trouvée dans la documentation. Réponds en français avec tes connaissances générales sur ESILV.
-
-Réponse:"""
+                    prompt = build_prompt(user_message, tool_result)
                     
                     prompt_messages = [HumanMessage(content=prompt)]
                     
@@ -488,6 +591,7 @@ Réponse:"""
                     logger.info(f"DEBUG: Sending prompt to LLM (length: {len(prompt)})")
                     
                     logger.info("Calling LLM to format response...")
+                    llm_ref = heavy_llm_ref if needs_reasoning_model(user_message) else light_llm_ref
                     if hasattr(llm_ref, 'ainvoke'):
                         llm_response = await llm_ref.ainvoke(prompt_messages)
                     else:
@@ -511,24 +615,18 @@ Réponse:"""
                         # Try to extract from dict or other formats
                         answer = str(llm_response)
                         # Remove metadata if present (like role='assistant', thinking=None, etc.)
-                        import re
                         # If answer contains metadata format, extract just the content
-                        content_match = re.search(r"content=['\"](.*?)['\"]", answer, re.DOTALL)
+                        content_match = _CONTENT_RE.search(answer)
                         if content_match:
                             answer = content_match.group(1)
-                        # Clean up any remaining metadata patterns
-                        answer = re.sub(r"role=['\"][^'\"]*['\"]\s*", "", answer)
-                        answer = re.sub(r"thinking=None\s*", "", answer)
-                        answer = re.sub(r"images=None\s*", "", answer)
-                        answer = re.sub(r"tool_name=None\s*", "", answer)
-                        answer = re.sub(r"tool_calls=None\s*", "", answer)
+                        # Clean up any remaining metadata patterns in a single pass
+                        answer = _MESSAGE_METADATA_RE.sub("", answer)
                         answer = answer.strip()
                     
                     logger.info(f"Answer extracted (length: {len(answer)})")
                     
                     return {"output": answer}
                 except Exception as e:
-                    import traceback
                     logger.error(f"Error in retrieval agent: {str(e)}")
                     logger.error(f"Traceback: {traceback.format_exc()}")
                     return {"output": f"Error: {str(e)}"}
@@ -539,6 +637,34 @@ Réponse:"""
         """Get the retrieval tool for use by other agents."""
         return self.tool
     
+    async def process_query_stream(self, query: str) -> AsyncIterator[str]:
+        """
+        Answer a retrieval query, yielding text chunks as the LLM generates them.
+        
+        Args:
+            query: User's query
+        
+        Yields:
+            Answer text chunks
+        """
+        # The vector search is blocking, keep it off the event loop (cached per normalized query)
+        tool_result = await asyncio.to_thread(self.search, query)
+        # Nothing retrieved: answer directly, an LLM round-trip adds nothing
+        canned = no_docs_answer(tool_result)
+        if canned is not None:
+            yield canned
+            return
+        prompt = self._build_prompt(query, tool_result)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Context length: %d", len(tool_result))
+            logger.debug("Context preview: %s", tool_result[:500])
+        llm, _ = self.select_llm(query)
+        # A single HumanMessage: some models ignore the SystemMessage
+        async for chunk in llm.astream([HumanMessage(content=prompt)]):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                yield text
+    
     async def process_query(self, query: str) -> Dict[str, Any]:
         """
         Process a retrieval query.
@@ -574,7 +700,7 @@ Réponse:"""
                 "answer": answer,
                 "metadata": {
                     "agent": "retrieval",
-                    "model": getattr(self.llm, 'model', 'unknown') if hasattr(self.llm, 'model') else "unknown"
+                    "model": self._model_name
                 }
             }
         except Exception as e:
@@ -10,36 +10,181 @@ except ImportError:
         create_tool_calling_agent = None
 
 from langchain.tools import tool
-from typing import Dict, Any, List
-from utils.llm_factory import get_llm
+from langchain_core.messages import HumanMessage, SystemMessage
+from typing import Dict, Any, AsyncIterator, List, Tuple
+from utils.llm_factory import get_llm, needs_reasoning_model
 from config import settings
+import asyncio
 import httpx
+import logging
+import re
+import threading
+import time
 from bs4 import BeautifulSoup
 
+logger = logging.getLogger(__name__)
+
+
+# News page path on the ESILV site (common news URL pattern)
+_NEWS_PATH = "/actualites"
+# Selectors for news articles on the ESILV site (adjust to the actual website structure)
+_ARTICLE_SELECTOR = 'article, .news-item, .post, .actualite'
+_NEWS_CLASS_RE = re.compile(r'news|actualite|article', re.IGNORECASE)
+_TITLE_TAGS = ('h1', 'h2', 'h3', 'h4', 'a')
+_DESCRIPTION_TAGS = ('p', 'div')
+
+# Prefixes of scrape_esilv_news results that are already the final (user-facing) answer
+_NEWS_UNAVAILABLE_PREFIXES = ("Could not find news articles", "Error scraping ESILV website")
+
+# Parsed news articles per page URL: url -> (fetched_at, articles)
+# Shared by every WebScraperAgent so all orchestrators reuse one fetch
+_NEWS_CACHE: Dict[str, Tuple[float, List[str]]] = {}
+_NEWS_CACHE_LOCK = threading.Lock()
+
+# Shared async HTTP client (keep-alive pool), created lazily inside the event loop
+_HTTP_CLIENT: httpx.AsyncClient = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _HTTP_CLIENT
+
+
+def _parse_news_articles(html: str, base_url: str) -> List[str]:
+    """
+    Extract up to 10 formatted articles from the news page HTML.
+    
+    Pure function of its inputs, so it can run in a worker thread.
+    
+    Args:
+        html: News page HTML
+        base_url: Site root used to absolutize relative links
+    
+    Returns:
+        Formatted article blocks (title, description, link)
+    """
+    # lxml's C parser is much faster than the pure-Python html.parser
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Extract news articles
+    articles = []
+    
+    # Try common selectors for news articles
+    article_elements = soup.select(_ARTICLE_SELECTOR, limit=10)
+    
+    if not article_elements:
+        # Fallback: look for any links with news-related text
+        article_elements = soup.find_all(['a', 'div'], class_=_NEWS_CLASS_RE, limit=10)
+    
+    for element in article_elements:  # Limited to 10 articles
+        title = element.find(_TITLE_TAGS)
+        if title:
+            title_text = title.get_text(strip=True)
+            link = element.find('a')
+            link_url = link.get('href', '') if link else ''
+            
+            if link_url and not link_url.startswith('http'):
+                link_url = f"{base_url}{link_url}"
+            
+            description = element.find(_DESCRIPTION_TAGS)
+            desc_text = description.get_text(strip=True) if description else ""
+            
+            article_info = f"Title: {title_text}\n"
+            if desc_text:
+                article_info += f"Description: {desc_text[:200]}...\n"
+            if link_url:
+                article_info += f"Link: {link_url}\n"
+            
+            articles.append(article_info)
+    
+    return articles
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient (called on application shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
 
 class WebScraperAgent:
     """Agent specialized in web scraping ESILV website."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm=None):
         """
         Initialize the web scraper agent.
         
         Args:
             model_name: Name of the model to use
+            llm: Pre-built LLM to use instead of get_llm(model_name)
         """
-        self.llm = get_llm(model_name=model_name)
+        self.llm = llm if llm is not None else get_llm(model_name=model_name)
+        # Small model for summarizing news (same as self.llm if not configured)
+        self.light_llm = get_llm(model_name=model_name, role="light")
+        # Resolved model name reported in response metadata
+        self._model_name = getattr(self.llm, 'model', 'unknown')
         self.base_url = settings.esilv_base_url
+        self.news_url = f"{self.base_url}{_NEWS_PATH}"
         self.tool = self._create_scraping_tool()
         
+        # Built once: a stable SystemMessage prefix lets backends reuse their prompt cache
+        self._system_message = SystemMessage(content=self._get_system_prompt())
+        
         # Use SimpleAgent by default as it works with all LLMs including Ollama
         self.agent = self._create_simple_agent()
     
+    async def _fetch_news_articles(self, news_url: str) -> List[str]:
+        """
+        Download the news page and extract up to 10 formatted articles.
+        
+        Args:
+            news_url: URL of the ESILV news page
+        
+        Returns:
+            Formatted article blocks (title, description, link)
+        """
+        response = await _get_http_client().get(news_url)
+        response.raise_for_status()
+        
+        # One small page: parse in a worker thread so the event loop stays free
+        return await asyncio.to_thread(_parse_news_articles, response.text, self.base_url)
+    
+    async def _get_news_articles(self, news_url: str) -> List[str]:
+        """
+        Return the parsed articles of the news page, fetching at most once per TTL.
+        
+        Args:
+            news_url: URL of the ESILV news page
+        
+        Returns:
+            Formatted article blocks (possibly empty)
+        """
+        now = time.monotonic()
+        with _NEWS_CACHE_LOCK:
+            cached = _NEWS_CACHE.get(news_url)
+        if cached and now - cached[0] < settings.news_cache_ttl_seconds:
+            return cached[1]
+        
+        articles = await self._fetch_news_articles(news_url)
+        with _NEWS_CACHE_LOCK:
+            _NEWS_CACHE[news_url] = (now, articles)
+        return articles
+    
     def _create_scraping_tool(self):
         """Create the web scraping tool."""
+        agent_ref = self
         base_url_ref = self.base_url
+        news_url_ref = self.news_url
         
         @tool
-        def scrape_esilv_news(query: str = "") -> str:
+        async def scrape_esilv_news(query: str = "") -> str:
             """Scrape the latest news and updates from the ESILV website.
             
             Args:
@@ -49,56 +194,19 @@ class WebScraperAgent:
                 Latest news and updates from ESILV website
             """
             try:
-                # Try to scrape the news page
-                news_url = f"{base_url_ref}/actualites"  # Common news URL pattern
+                # Try to scrape the news page (parsed articles are cached for a few minutes)
+                articles = await agent_ref._get_news_articles(news_url_ref)
                 
-                with httpx.Client(timeout=10.0) as client:
-                    response = client.get(news_url)
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Extract news articles (adjust selectors based on actual website structure)
-                    articles = []
-                    
-                    # Try common selectors for news articles
-                    article_elements = soup.select('article, .news-item, .post, .actualite')
-                    
-                    if not article_elements:
-                        # Fallback: look for any links with news-related text
-                        article_elements = soup.find_all(['a', 'div'], class_=lambda x: x and ('news' in x.lower() or 'actualite' in x.lower() or 'article' in x.lower()))
-                    
-                    for element in article_elements[:10]:  # Limit to 10 articles
-                        title = element.find(['h1', 'h2', 'h3', 'h4', 'a'])
-                        if title:
-                            title_text = title.get_text(strip=True)
-                            link = element.find('a')
-                            link_url = link.get('href', '') if link else ''
-                            
-                            if link_url and not link_url.startswith('http'):
-                                link_url = f"{base_url_ref}{link_url}"
-                            
-                            description = element.find(['p', 'div'])
-                            desc_text = description.get_text(strip=True) if description else ""
-                            
-                            article_info = f"Title: {title_text}\n"
-                            if desc_text:
-                                article_info += f"Description: {desc_text[:200]}...\n"
-                            if link_url:
-                                article_info += f"Link: {link_url}\n"
-                            
-                            articles.append(article_info)
-                    
-                    if not articles:
-                        return f"Could not find news articles on the ESILV website. Please visit {base_url_ref} for the latest updates."
-                    
-                    result = f"Latest news from ESILV:\n\n" + "\n---\n".join(articles)
-                    
-                    # Filter by query if provided
-                    if query:
-                        result = f"News related to '{query}':\n\n" + result
-                    
-                    return result
+                if not articles:
+                    return f"Could not find news articles on the ESILV website. Please visit {base_url_ref} for the latest updates."
+                
+                result = "Latest news from ESILV:\n\n" + "\n---\n".join(articles)
+                
+                # Filter by query if provided
+                if query:
+                    result = f"News related to '{query}':\n\n" + result
+                
+                return result
                     
             except Exception as e:
                 return f"Error scraping ESILV website: {str(e)}. Please visit {base_url_ref} for the latest updates."
@@ -108,8 +216,9 @@ class WebScraperAgent:
     def _create_simple_agent(self):
         """Create a simple agent when create_agent is not available."""
         tool_ref = self.tool
-        llm_ref = self.llm
-        system_prompt = self._get_system_prompt()
+        heavy_llm_ref = self.llm
+        light_llm_ref = self.light_llm
+        system_message_ref = self._system_message
         
         class SimpleAgent:
             async def ainvoke(self, input_dict):
@@ -124,13 +233,17 @@ class WebScraperAgent:
                     user_message = messages[-1].get("content", "") if isinstance(messages[-1], dict) else str(messages[-1])
                 
                 try:
-                    tool_result = tool_ref.invoke(user_message) if hasattr(tool_ref, 'invoke') else tool_ref(user_message)
+                    tool_result = await tool_ref.ainvoke(user_message)
+                    # No news (or fetch failed): the tool message already is the answer
+                    if tool_result.startswith(_NEWS_UNAVAILABLE_PREFIXES):
+                        return {"output": tool_result}
                     
-                    from langchain_core.messages import HumanMessage
                     prompt_messages = [
-                        HumanMessage(content=f"{system_prompt}\n\nUser query: {user_message}\n\nTool result: {tool_result}\n\nProvide a helpful answer:")
+                        system_message_ref,
+                        HumanMessage(content=f"User query: {user_message}\n\nTool result: {tool_result}\n\nProvide a helpful answer:")
                     ]
                     
+                    llm_ref = heavy_llm_ref if needs_reasoning_model(user_message) else light_llm_ref
                     if hasattr(llm_ref, 'ainvoke'):
                         llm_response = await llm_ref.ainvoke(prompt_messages)
                     else:
@@ -154,6 +267,30 @@ Use the scrape_esilv_news tool to get current information. Provide clear, concis
         """Get the scraping tool for use by other agents."""
         return self.tool
     
+    async def process_query_stream(self, query: str) -> AsyncIterator[str]:
+        """
+        Answer a news query, yielding text chunks as the LLM generates them.
+        
+        Args:
+            query: User's query
+        
+        Yields:
+            Answer text chunks
+        """
+        tool_result = await self.tool.ainvoke(query)
+        if tool_result.startswith(_NEWS_UNAVAILABLE_PREFIXES):
+            yield tool_result
+            return
+        prompt_messages = [
+            self._system_message,
+            HumanMessage(content=f"User query: {query}\n\nTool result: {tool_result}\n\nProvide a helpful answer:")
+        ]
+        llm = self.llm if needs_reasoning_model(query) else self.light_llm
+        async for chunk in llm.astream(prompt_messages):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                yield text
+    
     async def process_query(self, query: str) -> Dict[str, Any]:
         """
         Process a web scraping query.
@@ -189,7 +326,7 @@ Use the scrape_esilv_news tool to get current information. Provide clear, concis
                 "answer": answer,
                 "metadata": {
                     "agent": "web_scraper",
-                    "model": getattr(self.llm, 'model', 'unknown') if hasattr(self.llm, 'model') else "unknown"
+                    "model": self._model_name
                 }
             }
         except Exception as e:
@@ -1,21 +1,12 @@
 """Admin API endpoints."""
 from fastapi import APIRouter
 from rag.vector_store import vector_store
-from agents.form_agent import FormAgent
+# Shared with the orchestrator; created lazily on first use to avoid startup errors
+from agents.registry import get_form_agent
 import os
 
 router = APIRouter()
 
-# Lazy initialization pour éviter les erreurs au démarrage
-_form_agent = None
-
-def get_form_agent():
-    """Get or create form agent instance."""
-    global _form_agent
-    if _form_agent is None:
-        _form_agent = FormAgent()
-    return _form_agent
-
 
 @router.get("/stats")
 async def get_stats():
@@ -53,3 +44,9 @@ async def get_contacts():
             "contacts": []
         }
 
+
+@router.post("/cache/clear")
+async def clear_caches():
+    """Invalidate cached retrieval results and answers (run after reindexing from a script)."""
+    vector_store.invalidate_caches()
+    return {"status": "cleared", "generation": vector_store.generation}
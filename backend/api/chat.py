@@ -1,16 +1,53 @@
 """Chat API endpoints."""
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, AsyncGenerator
+from typing import List, Optional, Dict, Any, AsyncGenerator, Sequence, Tuple
 import json
 import asyncio
+import time
+from collections import OrderedDict
+import httpx
 from agents.orchestrator import OrchestratorAgent
 from config import settings
 import logging
 
+# Optional: orjson serializes SSE frames faster than the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+
+# Response class for plain JSON endpoints
+_JSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+# Static framing of server-sent events, already encoded
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+
+def _sse(obj) -> bytes:
+    """Encode an object as a server-sent event frame."""
+    if ORJSON_AVAILABLE:
+        return _SSE_PREFIX + orjson.dumps(obj) + _SSE_SUFFIX
+    return _SSE_PREFIX + json.dumps(obj).encode("utf-8") + _SSE_SUFFIX
+
+
+# Frames that never change, encoded once
+_SSE_DONE = _sse({'type': 'done'})
+_SSE_TIMEOUT = _sse({'type': 'error', 'error': 'Server timed out while generating response. Please try again.'})
+
+
+def _json_loads(content: bytes):
+    """Decode a JSON payload, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
 router = APIRouter()
 
 
@@ -33,18 +70,109 @@ class ChatResponse(BaseModel):
     metadata: Dict[str, Any]
 
 
-# Global orchestrator instances (keyed by model name)
-_orchestrators: Dict[str, OrchestratorAgent] = {}
+# Shared (immutable) history of single-turn requests
+_EMPTY_HISTORY: tuple = ()
+
+
+def _history_dicts(request: ChatRequest) -> Sequence[Dict[str, str]]:
+    """Convert the conversation history to the format expected by the agent."""
+    if not request.conversation_history:
+        return _EMPTY_HISTORY
+    return [msg.model_dump() for msg in request.conversation_history]
+
+
+# Cached /models response: (monotonic timestamp, response). A background task
+# refreshes it every _MODELS_POLL_INTERVAL; requests refresh it themselves only
+# when it is older than _MODELS_TTL (poller not started or Ollama unreachable)
+_MODELS_POLL_INTERVAL = 15.0
+_MODELS_TTL = 30.0
+_models_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+_models_lock = asyncio.Lock()
+_models_poll_task: Optional[asyncio.Task] = None
+# Shared client for Ollama API calls (keeps the connection alive between calls)
+_OLLAMA_CLIENT: httpx.AsyncClient = None
+
+
+def _get_ollama_client() -> httpx.AsyncClient:
+    """Return the shared Ollama AsyncClient, creating it on first use."""
+    global _OLLAMA_CLIENT
+    if _OLLAMA_CLIENT is None or _OLLAMA_CLIENT.is_closed:
+        _OLLAMA_CLIENT = httpx.AsyncClient(timeout=5.0)
+    return _OLLAMA_CLIENT
+
+
+async def close_ollama_client() -> None:
+    """Close the shared Ollama AsyncClient (called on application shutdown)."""
+    global _OLLAMA_CLIENT
+    if _OLLAMA_CLIENT is not None:
+        await _OLLAMA_CLIENT.aclose()
+        _OLLAMA_CLIENT = None
+
+
+# Global orchestrator instances (keyed by model name), least recently used first
+_MAX_ORCHESTRATORS = 4
+_orchestrators: "OrderedDict[str, OrchestratorAgent]" = OrderedDict()
 
 
 def get_orchestrator(model_name: Optional[str] = None) -> OrchestratorAgent:
     """Get or create orchestrator instance for the specified model."""
     model_key = model_name or settings.ollama_default_model
     
-    if model_key not in _orchestrators:
-        _orchestrators[model_key] = OrchestratorAgent(model_name=model_key)
+    orchestrator = _orchestrators.get(model_key)
+    if orchestrator is None:
+        orchestrator = _orchestrators[model_key] = OrchestratorAgent(model_name=model_key)
+        if len(_orchestrators) > _MAX_ORCHESTRATORS:
+            evicted, _ = _orchestrators.popitem(last=False)
+            logger.info("Evicted orchestrator for model '%s'", evicted)
+    else:
+        _orchestrators.move_to_end(model_key)
+    
+    return orchestrator
+
+
+async def _check_model(model_name: Optional[str]) -> None:
+    """
+    Reject models that Ollama does not serve, before an orchestrator is built for them.
+    
+    Args:
+        model_name: Requested model (None means the default model)
     
-    return _orchestrators[model_key]
+    Raises:
+        HTTPException: 400 when the model is not in the /models list
+    """
+    if not model_name or model_name == settings.ollama_default_model:
+        return
+    # Cached for _MODELS_TTL; an empty list means Ollama is unreachable, so don't block
+    models = (await get_available_models())["models"]
+    if models and model_name not in models:
+        raise HTTPException(status_code=400, detail=f"Unknown model: {model_name}")
+
+
+async def _with_deadline(agen: AsyncGenerator, timeout_seconds: float) -> AsyncGenerator:
+    """
+    Re-yield the items of an async generator until a total time budget runs out.
+    
+    A stalled generator is cancelled at the deadline instead of being noticed
+    only when its next item finally arrives.
+    
+    Args:
+        agen: Async generator to consume
+        timeout_seconds: Total time allowed for the whole stream
+    
+    Raises:
+        asyncio.TimeoutError: When the budget is exhausted
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(agen.__anext__(), deadline - loop.time())
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        await agen.aclose()
 
 
 @router.post("/", response_model=ChatResponse)
@@ -58,37 +186,18 @@ async def chat(request: ChatRequest):
     Returns:
         Chat response with answer and metadata
     """
-    import time
     start_time = time.time()
+    logger.debug(
+        "Chat request: model=%s, history=%d messages, message=%.100s",
+        request.model, len(request.conversation_history or ()), request.message
+    )
     
-    logger.info("=" * 70)
-    logger.info("DEBUG: ========== CHAT REQUEST RECEIVED ==========")
-    logger.info(f"DEBUG: Model: {request.model}")
-    logger.info(f"DEBUG: Message (first 100 chars): {request.message[:100]}")
-    logger.info(f"DEBUG: History length: {len(request.conversation_history)}")
-    logger.info(f"DEBUG: Request received at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("=" * 70)
-    
-    # Flush logs immediately to ensure they appear
-    import sys
-    sys.stdout.flush()
+    await _check_model(request.model)
     
     try:
-        logger.info("DEBUG: Getting orchestrator...")
         orchestrator = get_orchestrator(request.model)
-        logger.info(f"DEBUG: ✅ Orchestrator retrieved: {type(orchestrator)}")
         
-        # Convert conversation history to the format expected by the agent
-        history = []
-        for msg in request.conversation_history:
-            history.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        logger.info(f"DEBUG: Converted history: {len(history)} messages")
-        
-        logger.info("DEBUG: Calling orchestrator.process_query()...")
-        process_start = time.time()
+        history = _history_dicts(request)
         
         # Process the query with timeout
         try:
@@ -99,45 +208,35 @@ async def chat(request: ChatRequest):
                 ),
                 timeout=120.0  # 2 minutes timeout
             )
-            process_time = time.time() - process_start
-            logger.info(f"DEBUG: ✅ Orchestrator response received in {process_time:.2f}s")
-            logger.info(f"DEBUG: Answer length: {len(response.get('answer', ''))}")
         except asyncio.TimeoutError:
-            logger.error("DEBUG: ❌ Orchestrator timeout after 120 seconds")
+            logger.error("Orchestrator timeout after 120 seconds")
             raise HTTPException(status_code=504, detail="Request timeout: The query took too long to process.")
         
-        logger.debug(f"DEBUG: Full response keys: {response.keys() if isinstance(response, dict) else 'Not a dict'}")
-        
         # Ensure response has the correct format
         if not isinstance(response, dict):
-            logger.error(f"DEBUG: ❌ Unexpected response type: {type(response)}")
+            logger.error("Unexpected response type: %s", type(response))
             response = {"answer": str(response), "metadata": {}}
         
         if "answer" not in response:
-            logger.error(f"DEBUG: ❌ Response missing 'answer' key: {response}")
+            logger.error("Response missing 'answer' key: %s", response)
             response["answer"] = "I received an unexpected response format."
         
         if "metadata" not in response:
             response["metadata"] = {}
         
-        total_time = time.time() - start_time
-        logger.info("=" * 70)
-        logger.info(f"DEBUG: ✅ CHAT REQUEST COMPLETED in {total_time:.2f}s")
-        logger.info("=" * 70)
+        logger.debug(
+            "Chat request completed in %.2fs (%d chars)",
+            time.time() - start_time, len(response["answer"])
+        )
         
-        return ChatResponse(**response)
+        # The orchestrator's dict is trusted: serialize it directly instead of
+        # validating it again through ChatResponse (still the documented schema)
+        return _JSONResponse(content={"answer": response["answer"], "metadata": response["metadata"]})
         
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        total_time = time.time() - start_time
-        logger.error("=" * 70)
-        logger.error(f"DEBUG: ❌❌❌ ERROR in chat endpoint after {total_time:.2f}s")
-        logger.error(f"DEBUG: Error: {str(e)}")
-        logger.error(f"DEBUG: Error type: {type(e)}")
-        logger.error(f"DEBUG: Full traceback:\n{traceback.format_exc()}")
-        logger.error("=" * 70)
+        logger.exception("Error in chat endpoint after %.2fs: %s", time.time() - start_time, e)
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
 
@@ -152,38 +251,19 @@ async def chat_stream(request: ChatRequest):
     Returns:
         Streaming response with chunks of the answer
     """
-    import time
     start_time = time.time()
+    logger.debug(
+        "Streaming chat request: model=%s, history=%d messages, message=%.100s",
+        request.model, len(request.conversation_history or ()), request.message
+    )
+    await _check_model(request.model)
     
-    # Log immediately when endpoint is called
-    logger.info("=" * 70)
-    logger.info("DEBUG: ========== STREAMING CHAT REQUEST RECEIVED ==========")
-    logger.info(f"DEBUG: Model: {request.model}")
-    logger.info(f"DEBUG: Message (first 100 chars): {request.message[:100]}")
-    logger.info(f"DEBUG: History length: {len(request.conversation_history)}")
-    logger.info(f"DEBUG: Request received at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("=" * 70)
-    
-    # Flush logs immediately to ensure they appear
-    import sys
-    sys.stdout.flush()
-    
-    async def generate_stream() -> AsyncGenerator[str, None]:
+    async def generate_stream() -> AsyncGenerator[bytes, None]:
         try:
-            logger.info("DEBUG: Getting orchestrator for streaming...")
             orchestrator = get_orchestrator(request.model)
-            logger.info(f"DEBUG: ✅ Orchestrator retrieved: {type(orchestrator)}")
             
-            # Convert conversation history to the format expected by the agent
-            history = []
-            for msg in request.conversation_history:
-                history.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            logger.info(f"DEBUG: Converted history: {len(history)} messages")
+            history = _history_dicts(request)
             
-            logger.info("DEBUG: Starting streaming query...")
             stream_start = time.time()
             
             # Add a server-side timeout for the streaming process
@@ -192,45 +272,29 @@ async def chat_stream(request: ChatRequest):
             chunk_count = 0
             # Use streaming version if available, otherwise fallback to regular processing
             if hasattr(orchestrator, 'process_query_stream'):
-                logger.info("DEBUG: Using process_query_stream()...")
                 try:
-                    # Create a wrapper that handles timeout manually
                     stream_gen = orchestrator.process_query_stream(
                         query=request.message,
                         conversation_history=history
                     )
                     
-                    # Consume the stream with manual timeout checking
-                    last_chunk_time = time.time()
-                    async for chunk in stream_gen:
-                        # Check for timeout
-                        elapsed = time.time() - stream_start
-                        if elapsed > timeout_seconds:
-                            logger.error(f"DEBUG: ❌ Streaming chat timed out after {elapsed:.2f}s ({timeout_seconds}s limit)")
-                            yield f"data: {json.dumps({'type': 'error', 'error': 'Server timed out while generating response. Please try again.'})}\n\n"
-                            break
-                        
+                    # Consume the stream; raises asyncio.TimeoutError past the deadline
+                    async for chunk in _with_deadline(stream_gen, timeout_seconds):
                         chunk_count += 1
-                        if chunk_count % 10 == 0:
-                            logger.debug(f"DEBUG: Streamed {chunk_count} chunks so far...")
-                        yield f"data: {json.dumps(chunk)}\n\n"
-                        last_chunk_time = time.time()
+                        yield _sse(chunk)
                     
-                    stream_time = time.time() - stream_start
-                    logger.info(f"DEBUG: ✅ Streaming completed: {chunk_count} chunks in {stream_time:.2f}s")
+                    logger.debug("Streaming completed: %d chunks in %.2fs", chunk_count, time.time() - stream_start)
                 except asyncio.TimeoutError:
-                    stream_time = time.time() - stream_start
-                    logger.error(f"DEBUG: ❌ Streaming chat timed out after {stream_time:.2f}s ({timeout_seconds}s limit)")
-                    yield f"data: {json.dumps({'type': 'error', 'error': 'Server timed out while generating response. Please try again.'})}\n\n"
+                    logger.error(
+                        "Streaming chat timed out after %.2fs (%ss limit)",
+                        time.time() - stream_start, timeout_seconds
+                    )
+                    yield _SSE_TIMEOUT
                 except Exception as e:
-                    stream_time = time.time() - stream_start
-                    logger.error(f"DEBUG: ❌ Streaming error after {stream_time:.2f}s: {str(e)}")
-                    import traceback
-                    logger.error(f"DEBUG: Traceback: {traceback.format_exc()}")
-                    yield f"data: {json.dumps({'type': 'error', 'error': f'Error during streaming: {str(e)}'})}\n\n"
+                    logger.exception("Streaming error after %.2fs: %s", time.time() - stream_start, e)
+                    yield _sse({'type': 'error', 'error': f'Error during streaming: {str(e)}'})
             else:
-                logger.info("DEBUG: process_query_stream() not available, using fallback...")
-                # Fallback: process normally and stream chunks
+                # Fallback: process normally and send the complete answer
                 response = await orchestrator.process_query(
                     query=request.message,
                     conversation_history=history
@@ -240,41 +304,27 @@ async def chat_stream(request: ChatRequest):
                 metadata = response.get("metadata", {})
                 
                 # Stream metadata first
-                yield f"data: {json.dumps({'type': 'metadata', 'data': metadata})}\n\n"
+                yield _sse({'type': 'metadata', 'data': metadata})
                 
-                # Stream answer in chunks
-                chunk_size = 50  # Stream in small chunks for better UX
-                for i in range(0, len(answer), chunk_size):
-                    chunk = answer[i:i + chunk_size]
+                # The answer is already complete: send it as a single chunk
+                if answer:
                     chunk_count += 1
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
-                    await asyncio.sleep(0.01)  # Small delay for smoother streaming
+                    yield _sse({'type': 'chunk', 'content': answer})
                 
-                stream_time = time.time() - stream_start
-                logger.info(f"DEBUG: ✅ Fallback streaming completed: {chunk_count} chunks in {stream_time:.2f}s")
+                logger.debug("Fallback streaming completed: %d chunks in %.2fs", chunk_count, time.time() - stream_start)
                 
                 # Stream completion
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                yield _SSE_DONE
             
-            total_time = time.time() - start_time
-            logger.info("=" * 70)
-            logger.info(f"DEBUG: ✅ STREAMING REQUEST COMPLETED in {total_time:.2f}s")
-            logger.info("=" * 70)
+            logger.debug("Streaming request completed in %.2fs", time.time() - start_time)
                 
         except Exception as e:
-            import traceback
-            total_time = time.time() - start_time
-            logger.error("=" * 70)
-            logger.error(f"DEBUG: ❌❌❌ ERROR in streaming chat after {total_time:.2f}s")
-            logger.error(f"DEBUG: Error: {str(e)}")
-            logger.error(f"DEBUG: Error type: {type(e)}")
-            logger.error(f"DEBUG: Full traceback:\n{traceback.format_exc()}")
-            logger.error("=" * 70)
+            logger.exception("Error in streaming chat after %.2fs: %s", time.time() - start_time, e)
             error_chunk = {
                 "type": "error",
                 "error": f"Error processing chat: {str(e)}"
             }
-            yield f"data: {json.dumps(error_chunk)}\n\n"
+            yield _sse(error_chunk)
     
     return StreamingResponse(
         generate_stream(),
@@ -287,77 +337,111 @@ async def chat_stream(request: ChatRequest):
     )
 
 
+# Familles de modèles recommandées pour un agent RAG local (efficaces et performants) :
+# bon équilibre performance/vitesse, support multilingue
+_RECOMMENDED_RAG_BASES = frozenset({
+    "llama3.1", "llama3",  # Llama 3.x - Excellents pour RAG, bon support français/anglais
+    "mistral",             # Mistral - Très bon pour le français
+    "mixtral",             # Mixtral - Plus puissant, bon pour RAG complexe
+    "qwen2.5",             # Qwen2.5 - Excellent multilingue, très bon pour RAG
+    "gemma2",              # Gemma2 - Google, bon équilibre
+    "phi3",                # Phi3 - Microsoft, compact et efficace
+    "deepseek-r1",         # DeepSeek - Bon pour RAG
+})
+# Modèles exclus : cloud, et ministral (souvent cloud ou non optimisés)
+_EXCLUDED_MODEL_SUBSTRINGS = ("cloud", "ministral")
+
+
+def _model_sort_key(model: str) -> tuple:
+    """Sort key for model names: latest first, then numeric sizes (largest first), then others."""
+    parts = model.split(":")
+    base = parts[0].lower()
+    tag = parts[1].lower() if len(parts) > 1 else ""
+    
+    # Priorité : latest > versions numériques > autres
+    if tag == "latest":
+        return (0, base)
+    elif tag.replace("b", "").isdigit():
+        size = int(tag.replace("b", ""))
+        return (1, -size, base)  # Plus grand d'abord
+    else:
+        return (2, base)
+
+
 @router.get("/models")
 async def get_available_models():
     """
     Get list of available models - only local models effective for RAG agents.
     Excludes cloud models and models that are not suitable for local RAG.
-    """
-    import httpx
-    import logging
     
-    logger = logging.getLogger(__name__)
+    The list is a snapshot refreshed in the background (see start_models_poller),
+    so frontend polling does not hit Ollama on every request.
+    """
+    global _models_cache
+    cached = _models_cache
+    if cached is not None and time.monotonic() - cached[0] < _MODELS_TTL:
+        return cached[1]
     
+    # Only one request refreshes the list; the others wait and reuse it
+    async with _models_lock:
+        cached = _models_cache
+        if cached is not None and time.monotonic() - cached[0] < _MODELS_TTL:
+            return cached[1]
+        result = await _list_rag_models()
+        # Don't cache failures (empty list), so a restarted Ollama is picked up immediately
+        if result["models"]:
+            _models_cache = (time.monotonic(), result)
+        return result
+
+
+async def _poll_models() -> None:
+    """Refresh the /models snapshot forever; errors are logged, never raised."""
+    global _models_cache
+    while True:
+        try:
+            result = await _list_rag_models()
+            if result["models"]:
+                _models_cache = (time.monotonic(), result)
+        except Exception as e:
+            logger.error(f"Erreur lors du rafraîchissement des modèles: {e}")
+        await asyncio.sleep(_MODELS_POLL_INTERVAL)
+
+
+def start_models_poller() -> None:
+    """Start the background /models refresh (called on application startup)."""
+    global _models_poll_task
+    if _models_poll_task is None or _models_poll_task.done():
+        _models_poll_task = asyncio.create_task(_poll_models())
+
+
+async def stop_models_poller() -> None:
+    """Stop the background /models refresh (called on application shutdown)."""
+    global _models_poll_task
+    if _models_poll_task is not None:
+        _models_poll_task.cancel()
+        try:
+            await _models_poll_task
+        except asyncio.CancelledError:
+            pass
+        _models_poll_task = None
+
+
+async def _list_rag_models() -> Dict[str, Any]:
+    """Query Ollama and filter the installed models down to the RAG-suitable ones."""
     try:
-        # Liste des modèles recommandés pour un agent RAG local (efficaces et performants)
-        # Ces modèles sont optimisés pour le RAG : bon équilibre performance/vitesse, support multilingue
-        recommended_rag_models = [
-        # Llama 3.x - Excellents pour RAG, bon support français/anglais
-        "llama3.1",
-        "llama3.1:8b",
-        "llama3.1:70b",
-        "llama3",
-        "llama3:8b",
-        "llama3:70b",
-        
-        # Mistral - Très bon pour le français
-        "mistral",
-        "mistral:7b",
-        "mistral:latest",
-        
-        # Mixtral - Plus puissant, bon pour RAG complexe
-        "mixtral",
-        "mixtral:8x7b",
-        "mixtral:latest",
-        
-        # Qwen2.5 - Excellent multilingue, très bon pour RAG
-        "qwen2.5",
-        "qwen2.5:7b",
-        "qwen2.5:14b",
-        "qwen2.5:32b",
-        "qwen2.5:72b",
-        
-        # Gemma2 - Google, bon équilibre
-        "gemma2",
-        "gemma2:9b",
-        "gemma2:27b",
-        
-        # Phi3 - Microsoft, compact et efficace
-        "phi3",
-        "phi3:medium",
-        "phi3:mini",
-        
-        # DeepSeek - Bon pour RAG
-        "deepseek-r1",
-        "deepseek-r1:7b",
-        "deepseek-r1:14b",
-        ]
-        
         # Récupérer les modèles installés depuis Ollama
         installed_models_full = []
         try:
-            response = httpx.get(f"{settings.ollama_base_url}/api/tags", timeout=5.0)
+            response = await _get_ollama_client().get(f"{settings.ollama_base_url}/api/tags")
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 # Extraire les noms de modèles (avec leurs tags complets)
                 installed_models_full = [model.get("name", "") for model in data.get("models", [])]
-                logger.info(f"Modèles installés détectés depuis Ollama: {installed_models_full}")
+                logger.debug(f"Modèles installés détectés depuis Ollama: {installed_models_full}")
             else:
                 logger.warning(f"Ollama API returned status {response.status_code}")
         except Exception as e:
-            logger.error(f"Erreur lors de la récupération des modèles depuis Ollama: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Erreur lors de la récupération des modèles depuis Ollama: %s", e)
             return {
                 "models": [],
                 "default": settings.ollama_default_model
@@ -376,27 +460,14 @@ async def get_available_models():
         
         for installed_model in installed_models_full:
             model_name_lower = installed_model.lower()
-            model_base = installed_model.split(":")[0].lower()
             
-            # Exclure les modèles cloud
-            if "cloud" in model_name_lower:
-                logger.debug(f"Exclu (cloud): {installed_model}")
-                continue
-            
-            # Exclure les modèles ministral (souvent cloud ou non optimisés)
-            if "ministral" in model_name_lower:
-                logger.debug(f"Exclu (ministral): {installed_model}")
+            # Exclure les modèles cloud et ministral (souvent cloud ou non optimisés)
+            if any(excluded in model_name_lower for excluded in _EXCLUDED_MODEL_SUBSTRINGS):
+                logger.debug(f"Exclu (cloud/ministral): {installed_model}")
                 continue
             
             # Vérifier si le modèle est dans la liste recommandée
-            is_recommended = False
-            for recommended in recommended_rag_models:
-                recommended_base = recommended.split(":")[0].lower()
-                if model_base == recommended_base:
-                    is_recommended = True
-                    break
-            
-            if is_recommended:
+            if model_name_lower.split(":", 1)[0] in _RECOMMENDED_RAG_BASES:
                 available_models.append(installed_model)
                 logger.debug(f"Inclus (recommandé): {installed_model}")
             else:
@@ -408,25 +479,11 @@ async def get_available_models():
             logger.info("Aucun modèle recommandé trouvé, inclusion des modèles locaux non-cloud")
             for installed_model in installed_models_full:
                 model_name_lower = installed_model.lower()
-                if "cloud" not in model_name_lower and "ministral" not in model_name_lower:
+                if not any(excluded in model_name_lower for excluded in _EXCLUDED_MODEL_SUBSTRINGS):
                     available_models.append(installed_model)
         
         # Trier les modèles (prioriser les versions latest, puis par taille)
-        def sort_key(model):
-            parts = model.split(":")
-            base = parts[0].lower()
-            tag = parts[1].lower() if len(parts) > 1 else ""
-            
-            # Priorité : latest > versions numériques > autres
-            if tag == "latest":
-                return (0, base)
-            elif tag.replace("b", "").isdigit():
-                size = int(tag.replace("b", ""))
-                return (1, -size, base)  # Plus grand d'abord
-            else:
-                return (2, base)
-        
-        available_models.sort(key=sort_key)
+        available_models.sort(key=_model_sort_key)
         
         # Déterminer le modèle par défaut
         default_model = settings.ollama_default_model
@@ -446,16 +503,14 @@ async def get_available_models():
                 else:
                     logger.warning(f"Aucun modèle disponible, utilisation du défaut configuré: {default_model}")
         
-        logger.info(f"Modèles disponibles retournés ({len(available_models)}): {available_models}, défaut: {default_model}")
+        logger.debug(f"Modèles disponibles retournés ({len(available_models)}): {available_models}, défaut: {default_model}")
         
         return {
             "models": available_models,
             "default": default_model
         }
     except Exception as e:
-        import traceback
-        logger.error(f"Erreur dans get_available_models: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Erreur dans get_available_models: %s", e)
         # Retourner une réponse par défaut même en cas d'erreur
         return {
             "models": [],
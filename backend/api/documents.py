@@ -1,8 +1,16 @@
 """Document upload and management API endpoints."""
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import List, Optional
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional, Tuple
+import functools
+import json
 import os
-import aiofiles
+import re
+import time
+import traceback
+import urllib.parse
+from collections import Counter, deque
+from itertools import islice
 from rag.document_processor import document_processor
 from rag.vector_store import vector_store
 from utils.crawl4ai_scraper import crawl4ai_scraper
@@ -11,14 +19,157 @@ from config import settings
 from langchain_core.documents import Document
 import logging
 
+# Optional: orjson decodes the per-chunk "images" JSON and encodes responses faster than the stdlib json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+    _JSONResponse = ORJSONResponse
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+    _JSONResponse = JSONResponse
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=_JSONResponse)
 
 # Directory for uploaded documents
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Uploads are copied to disk in blocks of this size
+_UPLOAD_BLOCK_SIZE = 1 << 20
+
+# Concurrent blocking Chroma calls (keeps them from filling the default thread pool)
+_CHROMA_SEMAPHORE = asyncio.Semaphore(4)
+
+# Metadata fields naming a chunk's source, by priority
+_SOURCE_KEYS = ("source", "url", "filename")
+
+# Cached /rag/stats response: (monotonic timestamp, vector store generation, response)
+_STATS_TTL = 30.0
+_stats_cache: Optional[Tuple[float, int, Dict[str, Any]]] = None
+_stats_lock = asyncio.Lock()
+# Last successful collection.count(): (vector store generation, count)
+_doc_count_snapshot: Optional[Tuple[int, int]] = None
+
+# Source index: {source: {"source", "title", "chunks", "file_type", "scraped_from"}},
+# built from one scan of every chunk's metadata, updated in place by the upload
+# endpoints, and rebuilt after other vector store writes and every
+# _SOURCES_REFRESH_INTERVAL seconds
+_SOURCES_REFRESH_INTERVAL = 300.0
+_sources_index: Optional[Dict[str, Dict[str, Any]]] = None
+# Inverted index {source: [chunk ids]}, kept in step with _sources_index
+_source_chunk_ids: Dict[str, List[str]] = {}
+_sources_index_generation = -1
+_sources_lock = asyncio.Lock()
+_sources_refresh_task: Optional[asyncio.Task] = None
+
+# Uploads arriving within this window share one vector store write (up to about this many chunks)
+_ADD_BATCH_WINDOW = 0.1
+_ADD_BATCH_MAX_CHUNKS = 256
+# Queued writes: (documents, future resolved with their ids)
+_pending_adds: deque = deque()
+_add_flush_task: Optional[asyncio.Task] = None
+
+# /rag/sources pages larger than this are streamed, encoded this many sources at a time
+_SOURCES_STREAM_THRESHOLD = 200
+_SOURCES_STREAM_BATCH = 100
+
+# Default list of ESILV pages to scrape (one URL per line, # for comments)
+_ESILV_URLS_FILE = os.path.join(os.path.dirname(__file__), '..', 'esilv_urls.txt')
+# XML sitemaps are never scraped as pages
+_SITEMAP_RE = re.compile(r"\.xml$|sitemap", re.IGNORECASE)
+
+
+async def _run_chroma(func, *args, **kwargs):
+    """Run a blocking Chroma / vector store call in a worker thread, a few at a time."""
+    async with _CHROMA_SEMAPHORE:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def _add_documents(documents: List[Document]) -> List[str]:
+    """
+    Add documents to the vector store, batched with concurrent uploads.
+    
+    Args:
+        documents: Documents to index
+    
+    Returns:
+        Ids of the added documents, in order
+    
+    Raises:
+        Exception: Whatever vector_store.add_documents raised for the batch
+    """
+    global _add_flush_task
+    if not documents:
+        return []
+    future = asyncio.get_running_loop().create_future()
+    _pending_adds.append((documents, future))
+    if _add_flush_task is None:
+        _add_flush_task = asyncio.create_task(_flush_pending_adds())
+    return await future
+
+
+async def _flush_pending_adds() -> None:
+    """Write queued documents in batches once the batching window has passed."""
+    global _add_flush_task
+    try:
+        await asyncio.sleep(_ADD_BATCH_WINDOW)
+        while _pending_adds:
+            # Whole requests only: a batch may exceed the cap by its first request
+            batch = [_pending_adds.popleft()]
+            size = len(batch[0][0])
+            while _pending_adds and size + len(_pending_adds[0][0]) <= _ADD_BATCH_MAX_CHUNKS:
+                batch.append(_pending_adds.popleft())
+                size += len(batch[-1][0])
+            documents = [doc for docs, _ in batch for doc in docs]
+            
+            # Embedding is blocking, keep the event loop free
+            generation_before = getattr(vector_store, "generation", 0)
+            try:
+                doc_ids = await _run_chroma(vector_store.add_documents, documents)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            _add_to_sources_index(documents, doc_ids, generation_before)
+            
+            start = 0
+            for docs, future in batch:
+                if not future.done():
+                    future.set_result(doc_ids[start:start + len(docs)])
+                start += len(docs)
+    finally:
+        _add_flush_task = None
+
+
+def _save_upload(file: UploadFile, file_path: str) -> None:
+    """
+    Write an uploaded file to disk block by block (blocking).
+    
+    Raises:
+        HTTPException: 413 when the file exceeds settings.max_upload_size_mb
+            (the partial file is removed)
+    """
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    written = 0
+    file.file.seek(0)
+    with open(file_path, 'wb') as f:
+        while chunk := file.file.read(_UPLOAD_BLOCK_SIZE):
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            f.write(chunk)
+    if written > max_bytes:
+        os.remove(file_path)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large (max {settings.max_upload_size_mb} MB)"
+        )
+
 
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
@@ -34,15 +185,14 @@ async def upload_document(file: UploadFile = File(...)):
     try:
         # Save file
         file_path = os.path.join(UPLOAD_DIR, file.filename)
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        # Copy in blocks in a worker thread instead of buffering the whole file
+        await asyncio.to_thread(_save_upload, file, file_path)
         
         # Process document
         documents = await document_processor.process_file(file_path)
         
-        # Add to vector store
-        doc_ids = vector_store.add_documents(documents)
+        # Add to vector store (batched with concurrent uploads)
+        doc_ids = await _add_documents(documents)
         
         return {
             "message": "Document uploaded and processed successfully",
@@ -51,6 +201,8 @@ async def upload_document(file: UploadFile = File(...)):
             "document_ids": doc_ids
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading document: {str(e)}")
 
@@ -71,8 +223,8 @@ async def upload_text(text: str, metadata: dict = None):
         # Process text
         documents = document_processor.process_text(text, metadata=metadata)
         
-        # Add to vector store
-        doc_ids = vector_store.add_documents(documents)
+        # Add to vector store (batched with concurrent uploads)
+        doc_ids = await _add_documents(documents)
         
         return {
             "message": "Text uploaded and processed successfully",
@@ -97,7 +249,7 @@ async def search_documents(query: str, k: int = 4):
         Search results
     """
     try:
-        results = vector_store.similarity_search_with_score(query, k=k)
+        results = await _run_chroma(vector_store.similarity_search_with_score, query, k=k)
         
         return {
             "query": query,
@@ -115,24 +267,221 @@ async def search_documents(query: str, k: int = 4):
         raise HTTPException(status_code=500, detail=f"Error searching documents: {str(e)}")
 
 
+def _extract_source(metadata: dict):
+    """Source of a chunk: its "source", else its "url", else its "filename"."""
+    for key in _SOURCE_KEYS:
+        value = metadata.get(key)
+        if value:
+            return value
+    return "unknown"
+
+
+@functools.lru_cache(maxsize=8192)
+def _basename(source: str) -> str:
+    """Memoized os.path.basename (the same few sources recur on every row)."""
+    return os.path.basename(source)
+
+
+def _title(metadata: dict, source) -> str:
+    """Title of a chunk, defaulting to the basename of its source."""
+    title = metadata.get("title")
+    return title if title is not None else _basename(str(source))
+
+
+def _decode_images(images_raw) -> list:
+    """Decode the "images" metadata field (a list, or a JSON string since Chroma stores scalars)."""
+    if isinstance(images_raw, list):
+        return images_raw
+    if not images_raw or not isinstance(images_raw, str) or images_raw == "[]":
+        return []
+    try:
+        return _json_loads(images_raw)
+    except (ValueError, TypeError):
+        return []
+
+
+def _aggregate_sources(metadatas: List[Optional[dict]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Group chunk metadatas by source.
+    
+    Args:
+        metadatas: Chunk metadatas as returned by collection.get()
+    
+    Returns:
+        {source: {"source", "title", "chunks", "file_type", "scraped_from"}}, in
+        first-seen order, described by the first chunk of each source
+    """
+    sourced = [
+        (_extract_source(m), m)
+        for m in metadatas if m
+    ]
+    counts = Counter(source for source, _ in sourced)
+    first_meta = {}
+    for source, metadata in sourced:
+        if source:
+            first_meta.setdefault(source, metadata)
+    return {
+        source: {
+            "source": source,
+            "title": _title(metadata, source),
+            "chunks": counts[source],
+            "file_type": metadata.get("file_type", "unknown"),
+            "scraped_from": metadata.get("scraped_from", "esilv_website")
+        }
+        for source, metadata in first_meta.items()
+    }
+
+
+def _group_chunk_ids(ids: List[str], metadatas: List[Optional[dict]]) -> Dict[str, List[str]]:
+    """Map each source to the ids of its chunks (same source keys as _aggregate_sources)."""
+    chunk_ids = {}
+    for chunk_id, m in zip(ids, metadatas):
+        if m:
+            source = _extract_source(m)
+            if source:
+                chunk_ids.setdefault(source, []).append(chunk_id)
+    return chunk_ids
+
+
+def _build_sources_index() -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]]]:
+    """Aggregate chunk metadatas and ids by source (blocking Chroma scan)."""
+    sample_data = vector_store.collection.get(include=["metadatas"]) or {}
+    metadatas = sample_data.get("metadatas") or []
+    return _aggregate_sources(metadatas), _group_chunk_ids(sample_data.get("ids") or [], metadatas)
+
+
+def _add_to_sources_index(documents: List[Document], doc_ids: List[str], generation_before: int) -> None:
+    """
+    Count freshly indexed documents into the source index without rescanning.
+    
+    Only applies when the index was current right before this write; otherwise
+    the generation check makes the next reader rebuild it.
+    
+    Args:
+        documents: Documents just passed to vector_store.add_documents
+        doc_ids: Ids returned by vector_store.add_documents
+        generation_before: Vector store generation read before the write
+    """
+    global _sources_index_generation
+    generation = getattr(vector_store, "generation", 0)
+    # Skip if the index was stale, or if another write happened concurrently
+    if _sources_index is None or _sources_index_generation != generation_before or generation != generation_before + 1:
+        return
+    for source, entry in _aggregate_sources([doc.metadata for doc in documents]).items():
+        if source in _sources_index:
+            _sources_index[source]["chunks"] += entry["chunks"]
+        else:
+            _sources_index[source] = entry
+    for source, chunk_ids in _group_chunk_ids(doc_ids, [doc.metadata for doc in documents]).items():
+        _source_chunk_ids.setdefault(source, []).extend(chunk_ids)
+    _sources_index_generation = generation
+
+
+async def _refresh_sources_index() -> Dict[str, Dict[str, Any]]:
+    """Rebuild the source index in a worker thread and swap it in."""
+    global _sources_index, _source_chunk_ids, _sources_index_generation
+    generation = getattr(vector_store, "generation", 0)
+    index, chunk_ids = await _run_chroma(_build_sources_index)
+    _sources_index, _source_chunk_ids, _sources_index_generation = index, chunk_ids, generation
+    return index
+
+
+async def _get_sources_index() -> Dict[str, Dict[str, Any]]:
+    """Return the source index, rebuilding it first if the vector store changed."""
+    if _sources_index is not None and _sources_index_generation == getattr(vector_store, "generation", 0):
+        return _sources_index
+    async with _sources_lock:
+        if _sources_index is not None and _sources_index_generation == getattr(vector_store, "generation", 0):
+            return _sources_index
+        return await _refresh_sources_index()
+
+
+async def _periodic_sources_refresh() -> None:
+    """Rebuild the source index forever (picks up out-of-process reindexing); never raises."""
+    while True:
+        try:
+            async with _sources_lock:
+                await _refresh_sources_index()
+        except Exception as e:
+            vector_store.reset_collection()
+            logger.error(f"Error refreshing sources index: {e}")
+        await asyncio.sleep(_SOURCES_REFRESH_INTERVAL)
+
+
+def start_sources_refresher() -> None:
+    """Start the background source index refresh (called on application startup)."""
+    global _sources_refresh_task
+    if _sources_refresh_task is None or _sources_refresh_task.done():
+        _sources_refresh_task = asyncio.create_task(_periodic_sources_refresh())
+
+
+async def stop_sources_refresher() -> None:
+    """Stop the background source index refresh (called on application shutdown)."""
+    global _sources_refresh_task
+    if _sources_refresh_task is not None:
+        _sources_refresh_task.cancel()
+        try:
+            await _sources_refresh_task
+        except asyncio.CancelledError:
+            pass
+        _sources_refresh_task = None
+
+
 @router.get("/rag/stats")
 async def get_rag_stats():
     """
     Get RAG statistics including collection info and document counts.
     Optimized for speed to avoid timeouts.
     
+    Results are cached for _STATS_TTL seconds and dropped as soon as the
+    vector store is written to.
+    
     Returns:
         RAG statistics
     """
-    import time
+    global _stats_cache
+    cached = _stats_cache
+    if _stats_cache_valid(cached):
+        return cached[2]
+    
+    # Only one request recomputes the stats; the others wait and reuse them
+    async with _stats_lock:
+        cached = _stats_cache
+        if _stats_cache_valid(cached):
+            return cached[2]
+        result = await _compute_rag_stats()
+        if result["collection_info"].get("status") != "error":
+            _stats_cache = (time.monotonic(), getattr(vector_store, "generation", 0), result)
+        return result
+
+
+def _stats_cache_valid(cached: Optional[Tuple[float, int, Dict[str, Any]]]) -> bool:
+    """Whether a cached stats entry is recent and predates no vector store write."""
+    return (
+        cached is not None
+        and time.monotonic() - cached[0] < _STATS_TTL
+        and cached[1] == getattr(vector_store, "generation", 0)
+    )
+
+
+async def _peek_is_empty(peek_task: asyncio.Task) -> bool:
+    """Whether a concurrent collection.peek() found no chunks (False if it failed or hangs)."""
+    try:
+        sample = await asyncio.wait_for(asyncio.shield(peek_task), timeout=1.0)
+    except Exception:
+        return False
+    return not (sample and sample.get("ids"))
+
+
+async def _compute_rag_stats() -> Dict[str, Any]:
+    """Count the collection and sample its sources (slow: several Chroma calls)."""
+    global _doc_count_snapshot
     start_time = time.time()
     
-    logger.info("=" * 70)
-    logger.info("DEBUG: ========== RAG STATS REQUEST ==========")
-    logger.info("=" * 70)
+    logger.debug("========== RAG STATS REQUEST ==========")
     
     try:
-        logger.info(f"DEBUG: vector_store.collection_name = {vector_store.collection_name}")
+        logger.debug("vector_store.collection_name = %s", vector_store.collection_name)
         
         # Initialize variables
         sample_docs = []
@@ -142,19 +491,19 @@ async def get_rag_stats():
         # Get collection directly - use the same method as the startup test
         # This is more reliable than get_collection_info() which may fail with NotFoundError
         try:
-            logger.info("DEBUG: Getting collection from ChromaDB (same method as startup test)...")
+            logger.debug("Getting collection from ChromaDB (same method as startup test)...")
             try:
-                collection = vector_store.client.get_collection(name=vector_store.collection_name)
-                logger.info(f"DEBUG: ✅ Collection retrieved")
+                collection = vector_store.collection
+                logger.debug("✅ Collection retrieved")
                 # Try to peek to verify it's accessible
                 try:
-                    collection.peek(limit=1)
-                    logger.info("DEBUG: ✅ Collection is accessible")
+                    await _run_chroma(collection.peek, limit=1)
+                    logger.debug("✅ Collection is accessible")
                 except KeyError as peek_error:
                     # Handle '_type' error when peeking
                     if "'_type'" in str(peek_error) or "_type" in str(peek_error):
-                        logger.warning(f"DEBUG: ⚠️ Collection has '_type' error when peeking: {peek_error}")
-                        logger.warning("DEBUG: Collection exists but may have structure issues - count() may still work")
+                        logger.warning("⚠️ Collection has '_type' error when peeking: %s", peek_error)
+                        logger.warning("Collection exists but may have structure issues - count() may still work")
                     else:
                         raise
             except (KeyError, Exception) as ke:
@@ -163,22 +512,25 @@ async def get_rag_stats():
                 error_type = type(ke).__name__
                 
                 if "'_type'" in error_str or "_type" in error_str:
-                    logger.warning(f"DEBUG: ⚠️ Collection access error (likely '_type' issue): {ke}")
-                    logger.warning("DEBUG: This usually means the collection exists but may need to be re-indexed")
+                    logger.warning("⚠️ Collection access error (likely '_type' issue): %s", ke)
+                    logger.warning("This usually means the collection exists but may need to be re-indexed")
                     # Try to continue - count() might still work
                 elif "NotFoundError" in error_type or "does not exist" in error_str:
-                    logger.warning(f"DEBUG: ⚠️ Collection not found via get_collection(): {ke}")
-                    logger.info("DEBUG: Trying list_collections() as fallback...")
+                    logger.warning("⚠️ Collection not found via get_collection(): %s", ke)
+                    # The cached handle may be stale (collection recreated out of process)
+                    vector_store.reset_collection()
+                    collection = None
+                    logger.debug("Trying list_collections() as fallback...")
                     # Try list_collections() to find the collection
                     try:
-                        collections = vector_store.client.list_collections()
+                        collections = await _run_chroma(vector_store.client.list_collections)
                         for col in collections:
                             if col.name == vector_store.collection_name:
                                 collection = col
-                                logger.info(f"DEBUG: ✅ Found collection via list_collections(): {col.name}")
+                                logger.debug("✅ Found collection via list_collections(): %s", col.name)
                                 break
                         if collection is None:
-                            logger.error("DEBUG: ❌ Collection not found in list_collections() either")
+                            logger.error("❌ Collection not found in list_collections() either")
                             # Collection doesn't exist - return empty
                             return {
                                 "collection_info": {
@@ -191,7 +543,7 @@ async def get_rag_stats():
                                 "total_sources": 0
                             }
                     except Exception as list_error:
-                        logger.error(f"DEBUG: ❌ list_collections() also failed: {list_error}")
+                        logger.error("❌ list_collections() also failed: %s", list_error)
                         # Return error
                         return {
                             "collection_info": {
@@ -206,7 +558,7 @@ async def get_rag_stats():
                 else:
                     raise
         except Exception as collection_error:
-            logger.error(f"DEBUG: ❌ Error getting collection: {collection_error}")
+            logger.error("❌ Error getting collection: %s", collection_error)
             return {
                 "collection_info": {
                     "name": vector_store.collection_name,
@@ -220,7 +572,7 @@ async def get_rag_stats():
         
         # If collection is None after all fallbacks, return error
         if collection is None:
-            logger.error("DEBUG: ❌ Collection is None after all fallback attempts")
+            logger.error("❌ Collection is None after all fallback attempts")
             return {
                 "collection_info": {
                     "name": vector_store.collection_name,
@@ -246,60 +598,81 @@ async def get_rag_stats():
             # Use EXACT same method as test_rag_on_startup.py which successfully returns 93,239
             doc_count = 0
             try:
-                logger.info("DEBUG: Attempting collection.count() (EXACT same method as startup test)...")
+                logger.debug("Attempting collection.count() (EXACT same method as startup test)...")
                 def get_count():
                     return collection.count()
                 
+                # Cheap emptiness probe run alongside count(): if count() times out
+                # on an empty collection, the large-sample estimation is skipped
+                peek_task = asyncio.create_task(_run_chroma(collection.peek, 1))
+                # Retrieve its exception when nobody awaits it (count() succeeded)
+                peek_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                # Last exact count for this vector store generation: when count() fails,
+                # it is still exact, so the estimation ladder below is skipped
+                generation = getattr(vector_store, "generation", 0)
+                snapshot = _doc_count_snapshot
+                snapshot_count = snapshot[1] if snapshot is not None and snapshot[0] == generation else None
                 try:
                     doc_count = await asyncio.wait_for(
-                        asyncio.to_thread(get_count),
+                        _run_chroma(get_count),
                         timeout=10.0  # Same timeout as startup test
                     )
-                    logger.info(f"DEBUG: ✅ count() succeeded: {doc_count}")
+                    _doc_count_snapshot = (generation, doc_count)
+                    logger.debug("✅ count() succeeded: %s", doc_count)
                 except asyncio.TimeoutError:
-                    logger.warning("DEBUG: count() timed out after 10s, using large sample estimation...")
-                    # Fallback: use large sample for estimation
-                    try:
-                        larger = collection.get(limit=100000)  # Get up to 100k
-                        if larger and "ids" in larger:
-                            doc_count = len(larger["ids"])
-                            logger.info(f"DEBUG: Estimated count from sample: {doc_count}")
-                            if doc_count == 100000:
-                                # Indicate it's at least 100k
-                                doc_count = 100000
-                        else:
-                            logger.warning("DEBUG: Large sample is None or has no 'ids'")
-                            doc_count = 0
-                    except Exception as sample_error:
-                        logger.error(f"DEBUG: ❌ Error getting large sample: {sample_error}")
-                        # Try peek() as last resort
+                    if snapshot_count is not None:
+                        logger.warning("count() timed out after 10s, reusing last count: %s", snapshot_count)
+                        doc_count = snapshot_count
+                    elif await _peek_is_empty(peek_task):
+                        logger.warning("count() timed out after 10s, but peek() found no documents")
+                        doc_count = 0
+                    else:
+                        logger.warning("count() timed out after 10s, using large sample estimation...")
+                        # Fallback: use large sample for estimation
                         try:
-                            peek_sample = collection.peek(limit=1000)
-                            if peek_sample and "ids" in peek_sample:
-                                doc_count = len(peek_sample["ids"])
-                                logger.info(f"DEBUG: Estimated count from peek: {doc_count}")
-                        except Exception:
-                            doc_count = 0
+                            larger = await _run_chroma(collection.get, limit=100000)  # Get up to 100k
+                            if larger and "ids" in larger:
+                                doc_count = len(larger["ids"])
+                                logger.debug("Estimated count from sample: %s", doc_count)
+                                if doc_count == 100000:
+                                    # Indicate it's at least 100k
+                                    doc_count = 100000
+                            else:
+                                logger.warning("Large sample is None or has no 'ids'")
+                                doc_count = 0
+                        except Exception as sample_error:
+                            logger.error("❌ Error getting large sample: %s", sample_error)
+                            # Try peek() as last resort
+                            try:
+                                peek_sample = await _run_chroma(collection.peek, limit=1000)
+                                if peek_sample and "ids" in peek_sample:
+                                    doc_count = len(peek_sample["ids"])
+                                    logger.debug("Estimated count from peek: %s", doc_count)
+                            except Exception:
+                                doc_count = 0
                 except (KeyError, Exception) as count_error:
                     error_str = str(count_error)
-                    if "'_type'" in error_str or "_type" in error_str:
-                        logger.warning(f"DEBUG: count() failed with '_type' error, using peek() estimation...")
+                    if snapshot_count is not None:
+                        logger.warning("count() failed (%s), reusing last count: %s", count_error, snapshot_count)
+                        doc_count = snapshot_count
+                    elif "'_type'" in error_str or "_type" in error_str:
+                        logger.warning("count() failed with '_type' error, using peek() estimation...")
                         # Try peek() as fallback
                         try:
-                            peek_sample = collection.peek(limit=1000)
+                            peek_sample = await _run_chroma(collection.peek, limit=1000)
                             if peek_sample and "ids" in peek_sample:
                                 doc_count = len(peek_sample["ids"])
-                                logger.info(f"DEBUG: Estimated count from peek: {doc_count} (may be incomplete)")
+                                logger.debug("Estimated count from peek: %s (may be incomplete)", doc_count)
                             else:
                                 doc_count = 0
                         except Exception as peek_error:
-                            logger.error(f"DEBUG: ❌ peek() also failed: {peek_error}")
+                            logger.error("❌ peek() also failed: %s", peek_error)
                             doc_count = 0
                     else:
-                        logger.error(f"DEBUG: ❌ count() failed: {count_error}")
+                        logger.error("❌ count() failed: %s", count_error)
                         # Try small sample as last resort
                         try:
-                            sample = collection.get(limit=1000)
+                            sample = await _run_chroma(collection.get, limit=1000)
                             if sample and "ids" in sample:
                                 doc_count = len(sample["ids"])
                                 if doc_count == 1000:
@@ -309,25 +682,23 @@ async def get_rag_stats():
                         except Exception:
                             doc_count = 0
             except Exception as e:
-                logger.error(f"DEBUG: ❌ Error in count estimation: {e}")
-                import traceback
-                logger.error(f"DEBUG: Traceback: {traceback.format_exc()}")
+                logger.error("❌ Error in count estimation: %s", e, exc_info=True)
                 # Last resort: try to verify collection has documents using similarity_search
                 try:
-                    logger.info("DEBUG: Trying similarity_search as last resort to verify collection has documents...")
-                    test_results = vector_store.similarity_search("ESILV", k=1)
+                    logger.debug("Trying similarity_search as last resort to verify collection has documents...")
+                    test_results = await _run_chroma(vector_store.similarity_search, "ESILV", k=1)
                     if test_results:
-                        logger.info("DEBUG: ✅ similarity_search works - collection has documents")
+                        logger.debug("✅ similarity_search works - collection has documents")
                         # Use get() with large limit to estimate count
                         try:
-                            large_sample = collection.get(limit=100000)
+                            large_sample = await _run_chroma(collection.get, limit=100000)
                             if large_sample and "ids" in large_sample:
                                 doc_count = len(large_sample["ids"])
-                                logger.info(f"DEBUG: Estimated count from large sample: {doc_count}")
+                                logger.debug("Estimated count from large sample: %s", doc_count)
                             else:
                                 # Collection has documents but can't count - indicate it's not empty
                                 doc_count = 1  # At least 1 document exists
-                                logger.info("DEBUG: Collection has documents but exact count unavailable")
+                                logger.debug("Collection has documents but exact count unavailable")
                         except Exception:
                             doc_count = 1  # At least 1 document exists
                     else:
@@ -342,71 +713,64 @@ async def get_rag_stats():
                     "document_count": doc_count,
                     "status": "active" if doc_count > 0 else "empty"
                 }
-                logger.info(f"DEBUG: ✅ Collection info: {collection_info}")
+                logger.debug("✅ Collection info: %s", collection_info)
                 
-                # Get a sample of documents (limit to 50 for faster response)
-                logger.info("DEBUG: Getting sample documents (limit=50) for sources list...")
-                sample_data = collection.get(limit=50)  # Reduced from 100 for speed
-                logger.info(f"DEBUG: Sample data retrieved, type: {type(sample_data)}")
-                if isinstance(sample_data, dict):
-                    logger.info(f"DEBUG: Sample data keys: {sample_data.keys()}")
-                    if "ids" in sample_data:
-                        logger.info(f"DEBUG: Sample has {len(sample_data['ids'])} IDs")
-                    if "metadatas" in sample_data:
-                        logger.info(f"DEBUG: Sample has {len(sample_data.get('metadatas', []))} metadatas")
+                # Sources come from the shared source index (one scan, reused by /rag/sources)
+                try:
+                    sources_index = await _get_sources_index()
+                except Exception as index_error:
+                    logger.warning("⚠️ Sources index unavailable, sampling instead: %s", index_error)
+                    sources_index = None
                 
-                if sample_data and "metadatas" in sample_data and sample_data["metadatas"]:
-                    logger.info(f"DEBUG: Processing {len(sample_data['metadatas'])} metadatas...")
-                    sources_dict = {}
-                    for idx, metadata in enumerate(sample_data["metadatas"]):
-                        if metadata:
-                            source = metadata.get("source") or metadata.get("url") or metadata.get("filename", "unknown")
-                            if source and source not in unique_sources:
-                                unique_sources.add(source)
-                                sources_dict[source] = {
-                                    "source": source,
-                                    "title": metadata.get("title", os.path.basename(str(source))),
-                                    "chunks": 1,
-                                    "file_type": metadata.get("file_type", "unknown"),
-                                    "scraped_from": metadata.get("scraped_from", "esilv_website")
-                                }
-                            elif source in sources_dict:
-                                sources_dict[source]["chunks"] += 1
-                    
-                    sample_docs = list(sources_dict.values())[:20]  # Limit to 20 sources
-                    logger.info(f"DEBUG: Created {len(sample_docs)} sample documents from {len(unique_sources)} unique sources")
+                if sources_index:
+                    unique_sources.update(sources_index)
+                    sample_docs = list(islice(sources_index.values(), 20))  # Limit to 20 sources
                 else:
-                    # Fallback: use similarity search if direct get fails
-                    logger.warning("DEBUG: Sample data is None or has no metadatas, using similarity search fallback")
-                    try:
-                        logger.info("DEBUG: Attempting similarity_search('ESILV', k=10)...")
-                        sample_results = vector_store.similarity_search("ESILV", k=10)
-                        logger.info(f"DEBUG: Similarity search returned {len(sample_results)} results")
-                        sources = {}
-                        for doc in sample_results:
-                            source = doc.metadata.get("source", doc.metadata.get("filename", "unknown"))
-                            if source not in sources:
-                                sources[source] = {
-                                    "source": source,
-                                    "title": doc.metadata.get("title", os.path.basename(str(source))),
-                                    "chunks": 0,
-                                    "file_type": doc.metadata.get("file_type", "unknown"),
-                                    "scraped_from": doc.metadata.get("scraped_from", "upload")
-                                }
-                            sources[source]["chunks"] += 1
+                    # Get a sample of documents (limit to 50 for faster response)
+                    logger.debug("Getting sample documents (limit=50) for sources list...")
+                    sample_data = await _run_chroma(collection.get, limit=50)  # Reduced from 100 for speed
+                    logger.debug("Sample data retrieved, type: %s", type(sample_data))
+                    if isinstance(sample_data, dict):
+                        logger.debug("Sample data keys: %s", sample_data.keys())
+                        if "ids" in sample_data:
+                            logger.debug("Sample has %s IDs", len(sample_data['ids']))
+                        if "metadatas" in sample_data:
+                            logger.debug("Sample has %s metadatas", len(sample_data.get('metadatas', [])))
+                    
+                    if sample_data and "metadatas" in sample_data and sample_data["metadatas"]:
+                        logger.debug("Processing %s metadatas...", len(sample_data['metadatas']))
+                        sources_dict = _aggregate_sources(sample_data["metadatas"])
+                        unique_sources.update(sources_dict)
                         
-                        sample_docs = list(sources.values())[:20]  # Limit to 20 sources
-                        logger.info(f"DEBUG: Created {len(sample_docs)} sample documents from similarity search")
-                    except Exception as search_error:
-                        logger.error(f"DEBUG: ❌ Similarity search also failed: {search_error}")
-                        import traceback
-                        logger.error(f"DEBUG: Similarity search traceback: {traceback.format_exc()}")
-                        sample_docs = []
+                        sample_docs = list(islice(sources_dict.values(), 20))  # Limit to 20 sources
+                        logger.debug("Created %s sample documents from %s unique sources", len(sample_docs), len(unique_sources))
+                    else:
+                        # Fallback: use similarity search if direct get fails
+                        logger.warning("Sample data is None or has no metadatas, using similarity search fallback")
+                        try:
+                            logger.debug("Attempting similarity_search('ESILV', k=10)...")
+                            sample_results = await _run_chroma(vector_store.similarity_search, "ESILV", k=10)
+                            logger.debug("Similarity search returned %s results", len(sample_results))
+                            sources = {}
+                            for doc in sample_results:
+                                source = doc.metadata.get("source", doc.metadata.get("filename", "unknown"))
+                                if source not in sources:
+                                    sources[source] = {
+                                        "source": source,
+                                        "title": _title(doc.metadata, source),
+                                        "chunks": 0,
+                                        "file_type": doc.metadata.get("file_type", "unknown"),
+                                        "scraped_from": doc.metadata.get("scraped_from", "upload")
+                                    }
+                                sources[source]["chunks"] += 1
+                            
+                            sample_docs = list(islice(sources.values(), 20))  # Limit to 20 sources
+                            logger.debug("Created %s sample documents from similarity search", len(sample_docs))
+                        except Exception as search_error:
+                            logger.error("❌ Similarity search also failed: %s", search_error, exc_info=True)
+                            sample_docs = []
             except Exception as e:
-                logger.error(f"DEBUG: ❌ Exception in collection access: {str(e)}")
-                logger.error(f"DEBUG: Exception type: {type(e)}")
-                import traceback
-                logger.error(f"DEBUG: Full traceback: {traceback.format_exc()}")
+                logger.error("❌ Exception in collection access: %s", e, exc_info=True)
                 # Set default values
                 collection_info = {
                     "name": vector_store.collection_name,
@@ -417,7 +781,7 @@ async def get_rag_stats():
         
         # Try to get unique source count more efficiently
         total_unique_sources = len(unique_sources) if unique_sources else len(sample_docs)
-        logger.info(f"DEBUG: Calculated total unique sources: {total_unique_sources}")
+        logger.debug("Calculated total unique sources: %s", total_unique_sources)
         
         result = {
             "collection_info": collection_info,
@@ -425,61 +789,49 @@ async def get_rag_stats():
             "total_sources": total_unique_sources
         }
         
-        logger.info("=" * 70)
-        logger.info(f"DEBUG: ✅ Final result: document_count={collection_info.get('document_count', 0)}, sample_sources={len(sample_docs)}, total_sources={total_unique_sources}")
-        logger.info("=" * 70)
+        logger.debug("✅ Final result: document_count=%s, sample_sources=%s, total_sources=%s", collection_info.get('document_count', 0), len(sample_docs), total_unique_sources)
         
         return result
         
     except Exception as e:
-        logger.error("=" * 70)
-        logger.error(f"DEBUG: ❌❌❌ TOP-LEVEL ERROR in get_rag_stats: {str(e)}")
-        logger.error(f"DEBUG: Error type: {type(e)}")
-        import traceback
-        logger.error(f"DEBUG: Full traceback:\n{traceback.format_exc()}")
-        logger.error("=" * 70)
+        logger.error("❌❌❌ TOP-LEVEL ERROR in get_rag_stats: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error getting RAG stats: {str(e)}")
 
 
 @router.get("/rag/search")
-async def rag_search(query: str, k: int = 10):
+async def rag_search(query: str, k: int = 10, include_full: bool = False):
     """
     Search in RAG with detailed results including images.
     
     Args:
         query: Search query
         k: Number of results
+        include_full: Also return each chunk's untruncated text as "full_content"
     
     Returns:
         Detailed search results with images
     """
     try:
-        results = vector_store.similarity_search_with_score(query, k=k)
+        results = await _run_chroma(vector_store.similarity_search_with_score, query, k=k)
         
         formatted_results = []
         for doc, score in results:
             # Decode images from JSON string if needed
-            images_raw = doc.metadata.get("images", [])
-            images = []
-            if images_raw:
-                if isinstance(images_raw, str):
-                    try:
-                        import json
-                        images = json.loads(images_raw) if images_raw else []
-                    except (json.JSONDecodeError, TypeError):
-                        images = []
-                elif isinstance(images_raw, list):
-                    images = images_raw
+            images = _decode_images(doc.metadata.get("images"))
             
+            content = doc.page_content
             result_item = {
-                "content": doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content,
-                "full_content": doc.page_content,
+                # Chunk id, to fetch the full text later via /rag/chunk/{id}
+                "id": getattr(doc, "id", None),
+                "content": content[:500] + "..." if len(content) > 500 else content,
                 "metadata": doc.metadata,
                 "score": float(score),
                 "source": doc.metadata.get("source", doc.metadata.get("filename", "unknown")),
-                "title": doc.metadata.get("title", os.path.basename(str(doc.metadata.get("source", "unknown")))),
+                "title": _title(doc.metadata, doc.metadata.get("source", "unknown")),
                 "images": images
             }
+            if include_full:
+                result_item["full_content"] = content
             formatted_results.append(result_item)
         
         return {
@@ -493,6 +845,58 @@ async def rag_search(query: str, k: int = 10):
         raise HTTPException(status_code=500, detail=f"Error searching RAG: {str(e)}")
 
 
+@router.get("/rag/chunk/{chunk_id}")
+async def get_chunk(chunk_id: str):
+    """
+    Get the full text of a single chunk (e.g. a /rag/search hit opened in detail).
+    
+    Args:
+        chunk_id: Chunk id returned by /rag/search
+    
+    Returns:
+        Chunk id, content and metadata
+    """
+    try:
+        result = await _run_chroma(vector_store.collection.get, ids=[chunk_id])
+    except Exception as e:
+        vector_store.reset_collection()
+        logger.error(f"Error getting chunk {chunk_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting chunk: {str(e)}")
+    if not result or not result.get("ids"):
+        raise HTTPException(status_code=404, detail=f"Chunk not found: {chunk_id}")
+    return {
+        "id": chunk_id,
+        "content": (result.get("documents") or [""])[0],
+        "metadata": (result.get("metadatas") or [{}])[0] or {}
+    }
+
+
+def _get_source_chunks(collection, source: str, limit: int, offset: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Fetch one page of a source's chunks by metadata (no source index).
+    
+    Args:
+        collection: Chroma collection
+        source: Source path or URL
+        limit: Page size
+        offset: Page offset
+    
+    Returns:
+        (collection.get() style dict with "ids", "metadatas" and "documents",
+        total number of chunks of the source)
+    """
+    where = {"$or": [{"source": source}, {"url": source}]}
+    try:
+        # Single filtered query on either field; Chroma applies the offset itself
+        page = collection.get(where=where, limit=limit, offset=offset)
+        # Ids only, to report the real total (the page alone cannot tell if more remain)
+        total = len(collection.get(where=where, include=[]).get("ids") or [])
+        return page, total
+    except Exception as e:
+        logger.warning(f"Error querying chunks for source {source}: {e}")
+        return {"ids": [], "metadatas": [], "documents": []}, 0
+
+
 @router.get("/rag/source/{source_url:path}")
 async def get_source_details(source_url: str, limit: int = 50, offset: int = 0):
     """
@@ -507,79 +911,57 @@ async def get_source_details(source_url: str, limit: int = 50, offset: int = 0):
         Source details with chunks
     """
     try:
-        import urllib.parse
         # Decode the source URL
         decoded_source = urllib.parse.unquote(source_url)
         logger.info(f"Getting details for source: {decoded_source}")
         
         # Get the collection directly
-        collection = vector_store.client.get_collection(name=vector_store.collection_name)
+        collection = vector_store.collection
         
-        # Get all chunks for this source
+        # Look the chunk ids up in the inverted source index, then fetch only this page
         try:
-            # Try filtering by source field
-            results = collection.get(
-                where={"source": decoded_source},
-                limit=limit + offset
-            )
-        except Exception:
-            # Fallback: try with url field
-            try:
-                results = collection.get(
-                    where={"url": decoded_source},
-                    limit=limit + offset
+            await _get_sources_index()
+            source_chunk_ids = _source_chunk_ids.get(decoded_source)
+        except Exception as index_error:
+            logger.warning(f"Sources index unavailable, querying by metadata: {index_error}")
+            source_chunk_ids = None
+        
+        if source_chunk_ids is not None:
+            total_count = len(source_chunk_ids)
+            page_ids = source_chunk_ids[offset:offset+limit]
+            page = await _run_chroma(collection.get, ids=page_ids) if page_ids else {}
+            # Chroma does not guarantee the order of get(ids=...): restore the index order
+            by_id = {
+                doc_id: (metadata, document)
+                for doc_id, metadata, document in zip(
+                    page.get("ids") or [],
+                    page.get("metadatas") or [],
+                    page.get("documents") or []
                 )
-            except Exception:
-                # Last fallback: get all and filter manually
-                all_results = collection.get(limit=10000)
-                filtered_ids = []
-                filtered_documents = []
-                filtered_metadatas = []
-                
-                if all_results and "ids" in all_results and "metadatas" in all_results:
-                    for idx, metadata in enumerate(all_results.get("metadatas", [])):
-                        if metadata and (metadata.get("source") == decoded_source or metadata.get("url") == decoded_source):
-                            filtered_ids.append(all_results["ids"][idx])
-                            filtered_metadatas.append(metadata)
-                            if "documents" in all_results:
-                                filtered_documents.append(all_results["documents"][idx])
-                
-                results = {
-                    "ids": filtered_ids[offset:offset+limit],
-                    "metadatas": filtered_metadatas[offset:offset+limit],
-                    "documents": filtered_documents[offset:offset+limit] if filtered_documents else []
-                }
+            }
+            page_ids = [doc_id for doc_id in page_ids if doc_id in by_id]
+            results = {
+                "ids": page_ids,
+                "metadatas": [by_id[doc_id][0] for doc_id in page_ids],
+                "documents": [by_id[doc_id][1] for doc_id in page_ids]
+            }
+        else:
+            results, total_count = await _run_chroma(_get_source_chunks, collection, decoded_source, limit, offset)
         
-        # Format the results
+        # Format the results (both paths return just the requested page)
         chunks = []
-        total_count = 0
         
         if results and "ids" in results:
-            total_count = len(results["ids"])
-            metadatas = results.get("metadatas", [])
-            documents = results.get("documents", [])
-            
-            # Apply pagination
-            paginated_ids = results["ids"][offset:offset+limit]
-            paginated_metadatas = metadatas[offset:offset+limit] if metadatas else []
-            paginated_documents = documents[offset:offset+limit] if documents else []
+            paginated_ids = results["ids"]
+            paginated_metadatas = results.get("metadatas") or []
+            paginated_documents = results.get("documents") or []
             
             for idx, doc_id in enumerate(paginated_ids):
                 metadata = paginated_metadatas[idx] if idx < len(paginated_metadatas) else {}
                 content = paginated_documents[idx] if idx < len(paginated_documents) else ""
                 
                 # Extract images
-                images_raw = metadata.get("images", [])
-                images = []
-                if images_raw:
-                    if isinstance(images_raw, str):
-                        try:
-                            import json
-                            images = json.loads(images_raw) if images_raw else []
-                        except (json.JSONDecodeError, TypeError):
-                            images = []
-                    elif isinstance(images_raw, list):
-                        images = images_raw
+                images = _decode_images(metadata.get("images"))
                 
                 chunks.append({
                     "id": doc_id,
@@ -588,7 +970,7 @@ async def get_source_details(source_url: str, limit: int = 50, offset: int = 0):
                     "metadata": metadata,
                     "images": images,
                     "chunk_index": metadata.get("chunk_index", idx),
-                    "title": metadata.get("title", os.path.basename(str(decoded_source)))
+                    "title": _title(metadata, decoded_source)
                 })
         
         # Get source metadata from first chunk
@@ -598,7 +980,7 @@ async def get_source_details(source_url: str, limit: int = 50, offset: int = 0):
         
         return {
             "source": decoded_source,
-            "title": source_metadata.get("title", os.path.basename(str(decoded_source))),
+            "title": _title(source_metadata, decoded_source),
             "total_chunks": total_count,
             "chunks": chunks,
             "limit": limit,
@@ -609,12 +991,39 @@ async def get_source_details(source_url: str, limit: int = 50, offset: int = 0):
         }
         
     except Exception as e:
+        vector_store.reset_collection()
         logger.error(f"Error getting source details: {str(e)}")
-        import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error getting source details: {str(e)}")
 
 
+def _stream_sources_page(sources_list: List[Dict[str, Any]], total: int, limit: int, offset: int):
+    """
+    Encode a /rag/sources page piece by piece (same JSON as the non-streamed response).
+    
+    Args:
+        sources_list: Page of source entries
+        total: Total number of sources
+        limit: Page size
+        offset: Page offset
+    
+    Yields:
+        JSON bytes
+    """
+    yield b'{"sources":['
+    for start in range(0, len(sources_list), _SOURCES_STREAM_BATCH):
+        if start:
+            yield b','
+        yield b','.join(_json_dumps(source) for source in sources_list[start:start + _SOURCES_STREAM_BATCH])
+    yield (
+        b'],"total":' + _json_dumps(total)
+        + b',"limit":' + _json_dumps(limit)
+        + b',"offset":' + _json_dumps(offset)
+        + b',"has_more":' + _json_dumps((offset + limit) < total)
+        + b'}'
+    )
+
+
 @router.get("/rag/sources")
 async def get_sources_list(limit: int = 20, offset: int = 0):
     """
@@ -628,32 +1037,18 @@ async def get_sources_list(limit: int = 20, offset: int = 0):
         Paginated list of sources
     """
     try:
-        collection = vector_store.client.get_collection(name=vector_store.collection_name)
-        
-        # Get a larger sample to extract unique sources
-        sample_size = min(10000, (offset + limit) * 10)  # Get enough to find unique sources
-        sample_data = collection.get(limit=sample_size)
-        
-        sources_dict = {}
-        if sample_data and "metadatas" in sample_data and sample_data["metadatas"]:
-            for idx, metadata in enumerate(sample_data["metadatas"]):
-                if metadata:
-                    source = metadata.get("source") or metadata.get("url") or metadata.get("filename", "unknown")
-                    if source and source not in sources_dict:
-                        sources_dict[source] = {
-                            "source": source,
-                            "title": metadata.get("title", os.path.basename(str(source))),
-                            "chunks": 1,
-                            "file_type": metadata.get("file_type", "unknown"),
-                            "scraped_from": metadata.get("scraped_from", "esilv_website")
-                        }
-                    elif source in sources_dict:
-                        sources_dict[source]["chunks"] += 1
+        sources_dict = await _get_sources_index()
         
-        # Convert to list and apply pagination
-        sources_list = list(sources_dict.values())[offset:offset+limit]
+        # Apply pagination without copying the whole index
+        sources_list = list(islice(sources_dict.values(), offset, offset + limit))
         total_sources = len(sources_dict)
         
+        if len(sources_list) > _SOURCES_STREAM_THRESHOLD:
+            return StreamingResponse(
+                _stream_sources_page(sources_list, total_sources, limit, offset),
+                media_type="application/json"
+            )
+        
         return {
             "sources": sources_list,
             "total": total_sources,
@@ -671,12 +1066,43 @@ async def get_sources_list(limit: int = 20, offset: int = 0):
 async def delete_collection():
     """Delete the entire collection."""
     try:
-        vector_store.delete_collection()
+        await _run_chroma(vector_store.delete_collection)
         return {"message": "Collection deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting collection: {str(e)}")
 
 
+@functools.lru_cache(maxsize=8)
+def _load_esilv_urls(mtime: float) -> Tuple[str, ...]:
+    """Read and filter esilv_urls.txt (cached per file modification time)."""
+    with open(_ESILV_URLS_FILE, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    # One strip per line, then skip blanks, comments and sitemaps
+    return tuple(
+        url for url in map(str.strip, lines)
+        if url and not url.startswith('#') and not _SITEMAP_RE.search(url)
+    )
+
+
+def _get_scrape_urls(sections: Optional[List[str]]) -> List[str]:
+    """
+    Resolve the URLs to scrape, without XML sitemaps.
+    
+    Args:
+        sections: URLs given by the caller, or None for esilv_urls.txt
+            (falls back to the ESILV base URL when the file is missing)
+    
+    Returns:
+        URLs to scrape
+    """
+    if sections:
+        return [url for url in sections if not _SITEMAP_RE.search(url)]
+    try:
+        return list(_load_esilv_urls(os.path.getmtime(_ESILV_URLS_FILE)))
+    except FileNotFoundError:
+        return [url for url in [settings.esilv_base_url] if not _SITEMAP_RE.search(url)]
+
+
 @router.post("/scrape-esilv")
 async def scrape_esilv_website(
     background_tasks: BackgroundTasks,
@@ -706,47 +1132,28 @@ async def scrape_esilv_website(
         async def scrape_and_index():
             """Background async task to scrape and index."""
             try:
-                # Get URLs to scrape
-                urls = sections
-                if not urls:
-                    # Load from file
-                    urls_file = os.path.join(os.path.dirname(__file__), '..', 'esilv_urls.txt')
-                    if os.path.exists(urls_file):
-                        with open(urls_file, 'r', encoding='utf-8') as f:
-                            urls = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
-                    else:
-                        urls = [settings.esilv_base_url]
-                
-                # Filter out XML sitemap files
-                filtered_urls = [url for url in urls if not (url.endswith('.xml') or 'sitemap' in url.lower())]
+                # Get URLs to scrape (sitemaps filtered out)
+                filtered_urls = _get_scrape_urls(sections)
                 
                 # Initialize crawler
                 await crawl4ai_scraper._get_crawler()
                 
-                # Scrape URLs
-                all_content = await crawl4ai_scraper.scrape_urls(
+                # Scrape URLs (pages are indexed in batches as they are scraped)
+                stats = {"indexed": 0, "chunks": 0, "errors": 0}
+                await crawl4ai_scraper.scrape_urls(
                     urls=filtered_urls,
                     exclude_patterns=exclude_patterns,
-                    max_concurrent=max_concurrent
+                    max_concurrent=max_concurrent,
+                    index_stats=stats
                 )
-                
-                # Index the content
-                stats = crawl4ai_scraper.index_scraped_content(all_content)
                 logger.info(f"Crawl4AI scraping completed: {stats}")
-                
-                # Close crawler
-                await crawl4ai_scraper.close()
             except Exception as e:
+                # The shared crawler stays open: other scrapes may still be using it
                 logger.error(f"Error in background scraping task: {str(e)}")
-                import traceback
                 logger.error(f"Traceback: {traceback.format_exc()}")
-                try:
-                    await crawl4ai_scraper.close()
-                except:
-                    pass
         
-        # Run in background (FastAPI will handle the async task)
-        background_tasks.add_task(lambda: asyncio.run(scrape_and_index()))
+        # Run in background on the app's event loop (FastAPI awaits async tasks)
+        background_tasks.add_task(scrape_and_index)
         
         return {
             "message": "Crawl4AI scraping task started in background",
@@ -784,51 +1191,36 @@ async def scrape_esilv_website_sync(
         if exclude_patterns is None:
             exclude_patterns = [r".*\.pdf$"]
         
-        # Get URLs to scrape
-        urls = sections
-        if not urls:
-            # Load from file
-            urls_file = os.path.join(os.path.dirname(__file__), '..', 'esilv_urls.txt')
-            if os.path.exists(urls_file):
-                with open(urls_file, 'r', encoding='utf-8') as f:
-                    urls = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
-            else:
-                urls = [settings.esilv_base_url]
-        
-        # Filter out XML sitemap files
-        filtered_urls = [url for url in urls if not (url.endswith('.xml') or 'sitemap' in url.lower())]
+        # Get URLs to scrape (sitemaps filtered out)
+        filtered_urls = _get_scrape_urls(sections)
         
         logger.info(f"Using Crawl4AI to scrape {len(filtered_urls)} URLs")
         
         # Initialize crawler
         await crawl4ai_scraper._get_crawler()
         
-        try:
-            # Scrape URLs
-            all_content = await crawl4ai_scraper.scrape_urls(
-                urls=filtered_urls,
-                exclude_patterns=exclude_patterns,
-                max_concurrent=max_concurrent
-            )
-            
-            # Index the content
-            stats = crawl4ai_scraper.index_scraped_content(all_content)
-            
-            # Count total images
-            total_images = sum(len(content.get('images', [])) for content in all_content)
-            
-            return {
-                "message": "Crawl4AI scraping and indexing completed",
-                "pages_scraped": len(all_content),
-                "total_images": total_images,
-                "indexing_stats": stats,
-                "urls": filtered_urls[:10] if len(filtered_urls) > 10 else filtered_urls,  # Show first 10
-                "exclude_patterns": exclude_patterns,
-                "method": "crawl4ai"
-            }
-        finally:
-            # Always close crawler
-            await crawl4ai_scraper.close()
+        # Scrape URLs (pages are indexed in batches as they are scraped)
+        # The shared crawler stays open afterwards, even on errors (closed on shutdown)
+        stats = {"indexed": 0, "chunks": 0, "errors": 0}
+        all_content = await crawl4ai_scraper.scrape_urls(
+            urls=filtered_urls,
+            exclude_patterns=exclude_patterns,
+            max_concurrent=max_concurrent,
+            index_stats=stats
+        )
+        
+        # Count total images
+        total_images = sum(len(content.get('images', [])) for content in all_content)
+        
+        return {
+            "message": "Crawl4AI scraping and indexing completed",
+            "pages_scraped": len(all_content),
+            "total_images": total_images,
+            "indexing_stats": stats,
+            "urls": filtered_urls[:10] if len(filtered_urls) > 10 else filtered_urls,  # Show first 10
+            "exclude_patterns": exclude_patterns,
+            "method": "crawl4ai"
+        }
         
     except HTTPException:
         raise
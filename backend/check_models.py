@@ -5,14 +5,19 @@ import os
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import atexit
 import httpx
 import subprocess
 from config import settings
 
+# Client partagé : les appels à /api/tags réutilisent la même connexion (keep-alive)
+_client = httpx.Client(base_url=settings.ollama_base_url, timeout=10.0)
+atexit.register(_client.close)
+
 def check_ollama_running():
     """Vérifie si Ollama est en cours d'exécution."""
     try:
-        response = httpx.get(f"{settings.ollama_base_url}/api/tags", timeout=5.0)
+        response = _client.get("/api/tags", timeout=5.0)
         return response.status_code == 200
     except Exception:
         return False
@@ -20,17 +25,17 @@ def check_ollama_running():
 def get_installed_models():
     """Récupère la liste des modèles installés."""
     try:
-        response = httpx.get(f"{settings.ollama_base_url}/api/tags", timeout=10.0)
+        response = _client.get("/api/tags")
         if response.status_code == 200:
             data = response.json()
-            models = []
+            # dict : dédoublonnage en O(1) en gardant l'ordre de l'API
+            models = {}
             for model in data.get("models", []):
                 model_name = model.get("name", "")
                 # Extraire le nom de base (sans le tag)
                 base_name = model_name.split(":")[0] if ":" in model_name else model_name
-                if base_name not in models:
-                    models.append(base_name)
-            return models
+                models[base_name] = None
+            return list(models)
         return []
     except Exception as e:
         print(f"Erreur lors de la récupération des modèles: {e}")
@@ -92,15 +97,16 @@ def main():
     print(f"Modèles installés: {', '.join(installed_models) if installed_models else 'Aucun'}")
     
     # Modèles requis depuis la configuration
-    required_models = settings.ollama_available_models.copy()
+    required_models = settings.ollama_available_models
     
     print("\n3. Vérification des modèles requis...")
     missing_models = []
+    installed_set = frozenset(installed_models)
     
     # Vérifier chaque modèle requis
     for model in required_models:
         model_base = model.split(":")[0]  # Enlever le tag si présent
-        if model_base not in installed_models:
+        if model_base not in installed_set:
             missing_models.append(model)
             print(f"  ⚠ {model} manquant")
         else:
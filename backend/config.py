@@ -1,6 +1,6 @@
 """Configuration management for the ESILV Smart Assistant."""
 import os
-from typing import List
+from typing import List, Tuple
 try:
     from pydantic_settings import BaseSettings
 except ImportError:
@@ -13,10 +13,13 @@ class Settings(BaseSettings):
     # Ollama Configuration
     ollama_base_url: str = "http://localhost:11434"
     ollama_default_model: str = "llama3"
+    # Small model used to format retrieved context/news when the query needs no
+    # reasoning (e.g. "llama3.2:1b"); empty = always use the requested model
+    ollama_light_model: str = ""
     # Liste des modèles recommandés pour RAG (locaux uniquement, efficaces pour agents)
     # Priorité aux modèles avec grands context windows pour RAG ultra-long
     # Les modèles cloud sont automatiquement exclus par l'API
-    ollama_available_models: List[str] = [
+    ollama_available_models: Tuple[str, ...] = (
         # Ultra-long context (1M+ tokens) - Top pour RAG
         "qwen2.5",
         "qwen2.5:7b",
@@ -67,20 +70,37 @@ class Settings(BaseSettings):
         "mistral:7b",
         "gemma2",
         "gemma2:9b"
-    ]
+    )
+    
+    # LLM response cache: "" (disabled), "sqlite" or "redis"
+    llm_cache: str = ""
+    llm_cache_path: str = ".langchain_cache.db"
+    llm_cache_redis_url: str = "redis://localhost:6379/0"
+    
+    # Semantic cache of orchestrator answers (near-duplicate questions skip the agents)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_max_entries: int = 1000
+    semantic_cache_ttl_seconds: int = 3600
     
     # ChromaDB Configuration
     chroma_persist_directory: str = "./chroma_db"
     chroma_collection_name: str = "esilv_docs"
+    # Coalesce concurrent similarity searches into batched embedding + Chroma queries
+    vector_search_batching: bool = False
     
     # Embeddings Configuration
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"  # More efficient than Ollama
     use_ollama_embeddings: bool = False  # Set to True to use Ollama embeddings instead
+    # Texts per sentence-transformers forward pass when indexing documents
+    embedding_batch_size: int = 64
     
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     cors_origins: List[str] = ["http://localhost:3000"]
+    # Uploads larger than this are rejected with 413
+    max_upload_size_mb: int = 100
     
     # GCP Configuration (Optional)
     google_application_credentials: str = ""
@@ -90,6 +110,8 @@ class Settings(BaseSettings):
     
     # ESILV Website
     esilv_base_url: str = "https://www.esilv.fr"
+    # Parsed news page reused by the web scraper agent for this many seconds
+    news_cache_ttl_seconds: int = 900
     
     # Crawl4AI Configuration (Open Source - No API Key Required)
     # Crawl4AI is used for web scraping - no API limits or costs
@@ -1,17 +1,32 @@
 """FastAPI application entry point."""
 # Configure logging FIRST, before any other imports that might use logging
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import time
+
+# Log records are queued by the request threads and written to stdout by a
+# listener thread, so logging never blocks the event loop on console I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout)  # Ensure logs go to stdout
+)
 
-# Configure logging with DEBUG level to see all logs
+# Configure logging (DEBUG by default to see all logs, override with LOG_LEVEL)
 logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG to see all logs
+    level=os.getenv("LOG_LEVEL", "DEBUG").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)  # Ensure logs go to stdout
+        logging.handlers.QueueHandler(_log_queue)
     ],
     force=True  # Force reconfiguration if already configured
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flush queued records on exit
 
 logger = logging.getLogger(__name__)
 logger.info("=" * 70)
@@ -54,26 +69,23 @@ logger.info(f"DEBUG: ✅ CORS middleware added (origins: {settings.cors_origins}
 @app.middleware("http")
 async def log_requests(request, call_next):
     """Log all incoming requests."""
-    import time
     start_time = time.time()
     
-    # Log request
-    logger.info("=" * 70)
-    logger.info(f"DEBUG: 📥 INCOMING REQUEST: {request.method} {request.url.path}")
-    logger.info(f"DEBUG: Client: {request.client.host if request.client else 'unknown'}")
-    logger.info(f"DEBUG: Headers: {dict(request.headers)}")
-    
     # Process request
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
-        logger.info(f"DEBUG: ✅ REQUEST COMPLETED in {process_time:.2f}s - Status: {response.status_code}")
-        logger.info("=" * 70)
+        logger.debug(
+            "%s %s from %s completed in %.2fs - Status: %s",
+            request.method, request.url.path,
+            request.client.host if request.client else "unknown",
+            time.time() - start_time, response.status_code
+        )
         return response
     except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(f"DEBUG: ❌ REQUEST FAILED after {process_time:.2f}s - Error: {str(e)}")
-        logger.error("=" * 70)
+        logger.error(
+            "%s %s failed after %.2fs - Error: %s",
+            request.method, request.url.path, time.time() - start_time, e
+        )
         raise
 
 # Include routers
@@ -92,7 +104,6 @@ logger.info("=" * 70)
 @app.get("/")
 async def root():
     """Root endpoint."""
-    logger.info("DEBUG: Root endpoint called")
     return {
         "message": "ESILV Smart Assistant API",
         "version": "1.0.0",
@@ -103,7 +114,6 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    logger.info("DEBUG: Health check endpoint called")
     return {"status": "healthy"}
 
 
@@ -119,6 +129,10 @@ async def startup_event():
     logger.info(f"DEBUG: ChromaDB Path: {settings.chroma_persist_directory}")
     logger.info("=" * 70)
     
+    # Keep the /models list and the RAG source index fresh in the background
+    chat.start_models_poller()
+    documents.start_sources_refresher()
+    
     # Run RAG functionality test
     logger.info("DEBUG: Running RAG functionality test...")
     try:
@@ -139,10 +153,22 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log shutdown event."""
+    """Log shutdown event and release shared HTTP connections."""
     logger.info("=" * 70)
     logger.info("DEBUG: ========== FASTAPI SHUTDOWN EVENT ==========")
     logger.info("=" * 70)
+    
+    from agents.web_scraper_agent import close_http_client
+    await close_http_client()
+    
+    from api.chat import stop_models_poller, close_ollama_client
+    from api.documents import stop_sources_refresher
+    await stop_models_poller()
+    await stop_sources_refresher()
+    await close_ollama_client()
+    
+    from utils.crawl4ai_scraper import crawl4ai_scraper
+    await crawl4ai_scraper.close()
 
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ except ImportError:
 
 from typing import List
 import aiofiles
+import asyncio
 import os
 
 
@@ -67,10 +68,11 @@ class DocumentProcessor:
             try:
                 from langchain_community.document_loaders import PyPDFLoader
                 loader = PyPDFLoader(file_path)
-                docs = loader.load()
+                # Parsing and splitting are CPU-bound: keep them off the event loop
+                docs = await asyncio.to_thread(loader.load)
                 
                 # Split into chunks
-                chunks = self.text_splitter.split_documents(docs)
+                chunks = await asyncio.to_thread(self.text_splitter.split_documents, docs)
                 
                 # Add rich metadata to each chunk (as recommended in the guide)
                 for i, chunk in enumerate(chunks):
@@ -122,7 +124,7 @@ class DocumentProcessor:
         )
         
         # Split into chunks
-        chunks = self.text_splitter.split_documents([doc])
+        chunks = await asyncio.to_thread(self.text_splitter.split_documents, [doc])
         
         # Add rich metadata to each chunk
         for i, chunk in enumerate(chunks):
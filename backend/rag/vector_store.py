@@ -6,6 +6,9 @@ os.environ["CHROMA_TELEMETRY"] = "False"
 
 import chromadb
 import logging
+import queue
+import threading
+from concurrent.futures import Future
 from chromadb.config import Settings as ChromaSettings
 try:
     from langchain_chroma import Chroma
@@ -28,6 +31,60 @@ from utils.embeddings_factory import get_embeddings
 logger = logging.getLogger(__name__)
 
 
+class _BatchedSearcher:
+    """
+    Coalesce concurrent unfiltered similarity searches into batched queries.
+    
+    Callers enqueue (query, k) and block on a Future; a single worker thread
+    drains whatever is pending (up to max_batch), embeds each query with
+    embed_query and runs one Chroma query for the whole batch. Under
+    low load a batch is a single query, so no latency is added.
+    """
+    
+    def __init__(self, store: "VectorStore", max_batch: int = 32):
+        self.store = store
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="vector-search-batcher", daemon=True)
+        self._worker.start()
+    
+    def search(self, query: str, k: int) -> List[Document]:
+        """Run a similarity search through the batch worker (blocking)."""
+        future: Future = Future()
+        self._queue.put((query, k, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self._search_batch([query for query, _, _ in batch], max(k for _, k, _ in batch))
+                for (_, k, future), docs in zip(batch, results):
+                    future.set_result(docs[:k])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+    
+    def _search_batch(self, queries: List[str], k: int) -> List[List[Document]]:
+        # embed_query, not embed_documents: query-side embedding can differ (instructions,
+        # Ollama prompts), and batching must not change what the unbatched path retrieves
+        vectors = [self.store.embeddings.embed_query(query) for query in queries]
+        raw = self.store.collection.query(query_embeddings=vectors, n_results=k, include=["documents", "metadatas"])
+        results = []
+        for contents, metadatas in zip(raw.get("documents") or [], raw.get("metadatas") or []):
+            results.append([
+                Document(page_content=content, metadata=metadata or {})
+                for content, metadata in zip(contents, metadatas)
+                if content
+            ])
+        return results
+
+
 class VectorStore:
     """Manages vector storage for RAG."""
     
@@ -56,6 +113,10 @@ class VectorStore:
             
             self.collection_name = settings.chroma_collection_name
             self._vectorstore = None
+            self._collection = None
+            # Bumped on every write so callers can invalidate cached search results
+            self.generation = 0
+            self._batcher = _BatchedSearcher(self) if settings.vector_search_batching else None
             logger.info("DEBUG: ✅ VectorStore initialized")
             logger.info("=" * 70)
         except Exception as e:
@@ -77,7 +138,7 @@ class VectorStore:
                 )
                 # Test if collection is accessible by trying to peek
                 try:
-                    collection = self.client.get_collection(name=self.collection_name)
+                    collection = self.collection
                     # Try to peek to verify collection is accessible
                     collection.peek(limit=1)
                 except KeyError as ke:
@@ -98,6 +159,17 @@ class VectorStore:
                 )
         return self._vectorstore
     
+    @property
+    def collection(self):
+        """Get the Chroma collection handle (resolved once, then reused)."""
+        if self._collection is None:
+            self._collection = self.client.get_collection(name=self.collection_name)
+        return self._collection
+    
+    def reset_collection(self):
+        """Forget the cached collection handle (e.g. after it was deleted out of process)."""
+        self._collection = None
+    
     def add_documents(self, documents: List[Document]) -> List[str]:
         """
         Add documents to the vector store.
@@ -108,7 +180,9 @@ class VectorStore:
         Returns:
             List of document IDs
         """
-        return self.vectorstore.add_documents(documents)
+        ids = self.vectorstore.add_documents(documents)
+        self.generation += 1
+        return ids
     
     def similarity_search(
         self,
@@ -127,17 +201,18 @@ class VectorStore:
         Returns:
             List of similar documents
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         # Don't check collection info - it may fail with '_type' error
         # Just try the search directly
         try:
-            results = self.vectorstore.similarity_search(
-                query=query,
-                k=k,
-                filter=filter
-            )
+            if self._batcher is not None and filter is None:
+                # Concurrent unfiltered searches share one embedding pass and one query
+                results = self._batcher.search(query, k)
+            else:
+                results = self.vectorstore.similarity_search(
+                    query=query,
+                    k=k,
+                    filter=filter
+                )
             
             # Ensure all results are Document objects
             try:
@@ -206,11 +281,18 @@ class VectorStore:
             filter=filter
         )
     
+    def invalidate_caches(self):
+        """Invalidate cached search results and the collection handle (e.g. after an out-of-process reindex)."""
+        self._collection = None
+        self.generation += 1
+    
     def delete_collection(self):
         """Delete the collection."""
         try:
             self.client.delete_collection(name=self.collection_name)
             self._vectorstore = None
+            self._collection = None
+            self.generation += 1
         except Exception as e:
             print(f"Error deleting collection: {e}")
     
@@ -225,7 +307,7 @@ class VectorStore:
             logger.info("DEBUG: Getting collection from client...")
             collection = None
             try:
-                collection = self.client.get_collection(name=self.collection_name)
+                collection = self.collection
                 logger.info(f"DEBUG: ✅ Collection retrieved: {collection}")
                 logger.info(f"DEBUG: Collection type: {type(collection)}")
             except KeyError as ke:
@@ -310,7 +392,7 @@ class VectorStore:
             True if URL exists, False otherwise
         """
         try:
-            collection = self.client.get_collection(name=self.collection_name)
+            collection = self.collection
             # Search for documents with this URL in metadata
             # Try both "source" and "url" fields
             results_source = collection.get(
@@ -338,7 +420,7 @@ class VectorStore:
             """
             existing_urls = set()
             try:
-                collection = self.client.get_collection(name=self.collection_name)
+                collection = self.collection
                 count = collection.count()
                 
                 if count == 0:
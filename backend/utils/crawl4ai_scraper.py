@@ -1,6 +1,7 @@
 """Crawl4AI-based scraper for ESILV website - open source, no API limits."""
 import logging
 import asyncio
+import re
 import httpx
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Any
@@ -18,10 +19,16 @@ class Crawl4AIScraper:
         """Initialize the Crawl4AI scraper."""
         self.base_url = settings.esilv_base_url
         self._crawler = None
+        # Keeps concurrent scrapes from launching two browsers
+        self._crawler_lock = asyncio.Lock()
     
     async def _get_crawler(self):
-        """Get or create the AsyncWebCrawler instance."""
-        if self._crawler is None:
+        """Get or create the AsyncWebCrawler instance (reused across scrapes)."""
+        if self._crawler is not None:
+            return self._crawler
+        async with self._crawler_lock:
+            if self._crawler is not None:
+                return self._crawler
             try:
                 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
                 # Configure browser (headless for performance)
@@ -30,8 +37,9 @@ class Crawl4AIScraper:
                     browser_type="chromium",  # or "firefox", "webkit"
                     verbose=False
                 )
-                self._crawler = AsyncWebCrawler(config=browser_config)
-                await self._crawler.__aenter__()  # Initialize the crawler
+                crawler = AsyncWebCrawler(config=browser_config)
+                await crawler.__aenter__()  # Initialize the crawler
+                self._crawler = crawler
                 logger.info("Crawl4AI crawler initialized successfully")
             except ImportError:
                 logger.error("crawl4ai not installed. Run: pip install crawl4ai")
@@ -166,8 +174,6 @@ class Crawl4AIScraper:
         Returns:
             Dictionary with markdown content, images, and metadata, or None if error
         """
-        import re
-        
         # Check if URL should be excluded
         if exclude_patterns:
             for pattern in exclude_patterns:
@@ -289,7 +295,8 @@ class Crawl4AIScraper:
         urls: List[str],
         exclude_patterns: List[str] = None,
         max_concurrent: int = 5,
-        index_batch_size: int = 10
+        index_batch_size: int = 10,
+        index_stats: Optional[Dict[str, int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Scrape multiple URLs concurrently using Crawl4AI with httpx fallback.
@@ -300,6 +307,8 @@ class Crawl4AIScraper:
             exclude_patterns: List of regex patterns for URLs to exclude
             max_concurrent: Maximum number of concurrent scrapes
             index_batch_size: Number of URLs to scrape before indexing (default: 10)
+            index_stats: Optional dict that receives the summed "indexed", "chunks"
+                and "errors" counts of the batches indexed here
         
         Returns:
             List of scraped content dictionaries
@@ -311,9 +320,18 @@ class Crawl4AIScraper:
         if exclude_patterns is None:
             exclude_patterns = [r".*\.pdf$"]
         
+        # Drop duplicates (keeping order) and excluded URLs before any Chroma lookup or scrape
+        urls = list(dict.fromkeys(urls))
+        if exclude_patterns:
+            excluded = re.compile("|".join(f"(?:{pattern})" for pattern in exclude_patterns))
+            kept = [url for url in urls if not excluded.match(url)]
+            if len(kept) < len(urls):
+                logger.debug(f"Skipping {len(urls) - len(kept)} excluded URLs")
+            urls = kept
+        
         # Get existing URLs from RAG to skip them
         logger.info("Checking existing URLs in RAG...")
-        existing_urls = vector_store.get_existing_urls()
+        existing_urls = await asyncio.to_thread(vector_store.get_existing_urls)
         logger.info(f"Found {len(existing_urls)} existing URLs in RAG")
         
         # Filter out existing URLs
@@ -334,16 +352,25 @@ class Crawl4AIScraper:
         total_count = len(urls_to_scrape)
         batch_results = []
         indexed_count = 0
+        if index_stats is None:
+            index_stats = {}
+        
+        def add_batch_stats(batch_stats: Dict[str, int]) -> None:
+            nonlocal indexed_count
+            indexed_count += batch_stats['indexed']
+            for key, value in batch_stats.items():
+                index_stats[key] = index_stats.get(key, 0) + value
         
         async def scrape_with_semaphore(url, index):
-            nonlocal success_count, batch_results, indexed_count
+            nonlocal success_count, batch_results
             async with semaphore:
                 # Check again if URL exists (in case it was added by another process)
-                if vector_store.url_exists(url):
+                if await asyncio.to_thread(vector_store.url_exists, url):
                     logger.debug(f"⏭️  URL already in RAG (skipped): {url}")
                     return None
                 
-                result = await self.scrape_url(url, exclude_patterns=exclude_patterns, retries=2)
+                # Exclusions were already applied above
+                result = await self.scrape_url(url, retries=2)
                 if result:
                     success_count += 1
                     batch_results.append(result)
@@ -353,13 +380,12 @@ class Crawl4AIScraper:
                         logger.info(f"📊 Progress: {success_count}/{total_count} URLs scraped successfully")
                         logger.info(f"📥 Indexing batch of {len(batch_results)} URLs into RAG...")
                         
-                        # Index the batch
-                        batch_stats = self.index_scraped_content(batch_results)
-                        indexed_count += batch_stats['indexed']
+                        # Take the batch before awaiting (other scrapes keep appending)
+                        batch, batch_results = batch_results, []
+                        # Index the batch (embedding is blocking, keep the event loop free)
+                        batch_stats = await asyncio.to_thread(self.index_scraped_content, batch)
+                        add_batch_stats(batch_stats)
                         logger.info(f"✅ Indexed {batch_stats['indexed']} documents ({batch_stats['chunks']} chunks) - Total indexed: {indexed_count}")
-                        
-                        # Clear batch
-                        batch_results = []
                 
                 return result
         
@@ -378,20 +404,23 @@ class Crawl4AIScraper:
         # Index remaining batch
         if batch_results:
             logger.info(f"📥 Indexing final batch of {len(batch_results)} URLs into RAG...")
-            batch_stats = self.index_scraped_content(batch_results)
-            indexed_count += batch_stats['indexed']
+            batch_stats = await asyncio.to_thread(self.index_scraped_content, batch_results)
+            add_batch_stats(batch_stats)
             logger.info(f"✅ Indexed {batch_stats['indexed']} documents ({batch_stats['chunks']} chunks) - Total indexed: {indexed_count}")
         
         logger.info(f"✅ Scraped {len(valid_results)}/{len(urls_to_scrape)} new URLs successfully ({len(valid_results)*100//len(urls_to_scrape) if urls_to_scrape else 0}%)")
         logger.info(f"📊 Total: {indexed_count} documents indexed in this session")
         return valid_results
     
-    def index_scraped_content(self, content_list: List[Dict[str, Any]]) -> Dict[str, int]:
+    def index_scraped_content(self, content_list: List[Dict[str, Any]], batch_size: int = 128) -> Dict[str, int]:
         """
         Index scraped content into the vector store.
         
+        Chunks of consecutive pages are written together, about batch_size at a time.
+        
         Args:
             content_list: List of content dictionaries
+            batch_size: Number of chunks per vector store write (a large page is written whole)
         
         Returns:
             Dictionary with indexing statistics
@@ -427,6 +456,28 @@ class Crawl4AIScraper:
         total_chunks = 0
         indexed = 0
         errors = 0
+        # Chunks waiting to be written, and the (page, chunk count, image count) they come from
+        pending_chunks = []
+        pending_pages = []
+        
+        def flush():
+            """Write the pending chunks in one vector store call."""
+            nonlocal total_chunks, indexed, errors
+            if not pending_chunks:
+                return
+            try:
+                vector_store.add_documents(pending_chunks)
+                total_chunks += len(pending_chunks)
+                indexed += len(pending_pages)
+                for content, chunk_count, image_count in pending_pages:
+                    logger.info(f"Indexed {content.get('title', content.get('url', 'unknown'))}: {chunk_count} chunks, {image_count} images")
+            except Exception as e:
+                errors += len(pending_pages)
+                logger.error(f"Error indexing a batch of {len(pending_pages)} pages: {str(e)}")
+                import traceback
+                logger.error(f"Traceback: {traceback.format_exc()}")
+            pending_chunks.clear()
+            pending_pages.clear()
         
         for content in content_list:
             try:
@@ -488,13 +539,11 @@ class Crawl4AIScraper:
                 # Filter complex metadata before adding to ChromaDB
                 chunks = filter_complex_metadata(chunks)
                 
-                # Add to vector store
-                vector_store.add_documents(chunks)
-                
-                total_chunks += len(chunks)
-                indexed += 1
-                
-                logger.info(f"Indexed {content.get('title', content.get('url', 'unknown'))}: {len(chunks)} chunks, {len(images)} images")
+                # Queue for the next batched write to the vector store
+                if pending_chunks and len(pending_chunks) + len(chunks) > batch_size:
+                    flush()
+                pending_chunks.extend(chunks)
+                pending_pages.append((content, len(chunks), len(images)))
                 
             except Exception as e:
                 errors += 1
@@ -502,6 +551,7 @@ class Crawl4AIScraper:
                 import traceback
                 logger.error(f"Traceback: {traceback.format_exc()}")
                 continue
+        flush()
         
         return {
             "indexed": indexed,
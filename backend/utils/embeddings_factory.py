@@ -62,13 +62,19 @@ def get_embeddings(model_name: str = None):
             from langchain_huggingface import HuggingFaceEmbeddings
             emb_model = os.environ.get("EMB_MODEL", settings.embedding_model)
             logger.info(f"Using HuggingFaceEmbeddings with model: {emb_model}")
-            return HuggingFaceEmbeddings(model_name=emb_model)
+            return HuggingFaceEmbeddings(
+                model_name=emb_model,
+                encode_kwargs={"batch_size": settings.embedding_batch_size}
+            )
         except ImportError:
             # Fallback to langchain-community
             from langchain_community.embeddings import HuggingFaceEmbeddings
             emb_model = os.environ.get("EMB_MODEL", settings.embedding_model)
             logger.info(f"Using HuggingFaceEmbeddings (from langchain-community) with model: {emb_model}")
-            return HuggingFaceEmbeddings(model_name=emb_model)
+            return HuggingFaceEmbeddings(
+                model_name=emb_model,
+                encode_kwargs={"batch_size": settings.embedding_batch_size}
+            )
     except ImportError:
         # If sentence-transformers is not available, fallback to Ollama
         logger.warning("sentence-transformers not available, falling back to Ollama embeddings")
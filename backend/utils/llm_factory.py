@@ -1,4 +1,7 @@
 """LLM factory for creating model instances."""
+import asyncio
+import functools
+import traceback
 from typing import Optional, List, Any
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
@@ -19,6 +22,35 @@ except ImportError:
     import ollama
 
 
+def _configure_llm_cache() -> None:
+    """Enable LangChain's global LLM cache when settings.llm_cache is set.
+    
+    Identical (model, messages) calls are then answered from the cache
+    instead of hitting Ollama/GCP again.
+    """
+    backend = (settings.llm_cache or "").strip().lower()
+    if not backend:
+        return
+    try:
+        from langchain_core.globals import set_llm_cache
+        if backend == "sqlite":
+            from langchain_community.cache import SQLiteCache
+            set_llm_cache(SQLiteCache(database_path=settings.llm_cache_path))
+        elif backend == "redis":
+            import redis
+            from langchain_community.cache import RedisCache
+            set_llm_cache(RedisCache(redis.Redis.from_url(settings.llm_cache_redis_url)))
+        else:
+            logger.warning(f"Unknown llm_cache backend '{backend}', LLM cache disabled")
+            return
+        logger.info(f"LLM response cache enabled ({backend})")
+    except ImportError as e:
+        logger.warning(f"LLM cache '{backend}' unavailable ({e}), continuing without cache")
+
+
+_configure_llm_cache()
+
+
 # Model context window sizes (in tokens)
 MODEL_CONTEXT_WINDOWS = {
     # Qwen2.5 / Qwen3 - Ultra-long context
@@ -366,13 +398,11 @@ class OllamaChatModel(BaseChatModel):
             
         except Exception as e:
             logger.error(f"Error calling Ollama: {str(e)}")
-            import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
     
     async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
         """Async generate - run sync generate in thread pool."""
-        import asyncio
         logger.info("Starting async generate (running sync generate in thread pool)")
         try:
             result = await asyncio.to_thread(self._generate, messages, stop, **kwargs)
@@ -380,10 +410,7 @@ class OllamaChatModel(BaseChatModel):
             return result
         except Exception as e:
             logger.error(f"Error in async generate: {str(e)}")
-            import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
-            from langchain_core.messages import AIMessage
-            from langchain_core.outputs import ChatGeneration, ChatResult
             error_message = AIMessage(content=f"Erreur lors de la generation de la reponse: {str(e)}")
             generation = ChatGeneration(message=error_message)
             return ChatResult(generations=[generation])
@@ -409,20 +436,63 @@ class OllamaChatModel(BaseChatModel):
         return self
 
 
-def get_llm(model_name: Optional[str] = None, use_gcp: Optional[bool] = None):
+# Queries that ask for reasoning (why/how/comparison) rather than extract + rephrase
+_REASONING_RE = re.compile(
+    r"\b(?:pourquoi|comment|compar\w*|différence\w*|avantages?|analys\w*|expliqu\w*"
+    r"|why|how|compare\w*|difference\w*|explain\w*|versus|vs)\b",
+    re.IGNORECASE
+)
+
+
+def needs_reasoning_model(query: str) -> bool:
+    """
+    Tell whether a query should be answered by the reasoning model.
+    
+    Long queries and why/how/comparison questions go to the reasoning model;
+    everything else (formatting retrieved context or news) can use the light one.
+    
+    Args:
+        query: User's query
+    
+    Returns:
+        True if the reasoning model should be used
+    """
+    return len(query) > 200 or bool(_REASONING_RE.search(query))
+
+
+def get_llm(model_name: Optional[str] = None, use_gcp: Optional[bool] = None, role: str = "reasoning"):
     """
     Get an LLM instance based on configuration.
     
+    Instances are memoized per (model_name, use_gcp), so every agent asking
+    for the same model shares a single client.
+    
     Args:
         model_name: Name of the model to use (overrides default)
         use_gcp: Whether to use GCP (overrides settings)
+        role: "reasoning" for the requested model, "light" for the small
+            formatting model (settings.ollama_light_model, Ollama only; falls
+            back to the requested model when not configured)
     
     Returns:
         LLM instance
     """
     use_gcp = use_gcp if use_gcp is not None else settings.use_gcp
     model_name = model_name or settings.ollama_default_model
+    if role == "light" and settings.ollama_light_model and not use_gcp:
+        model_name = settings.ollama_light_model
+    return _create_llm(model_name, use_gcp)
+
+
+@functools.lru_cache(maxsize=8)
+def _create_llm(model_name: str, use_gcp: bool):
+    """
+    Build the LLM client for a resolved model name (cached by get_llm).
     
+    The cache is process-wide rather than per-thread: ChatOllama, the ollama
+    Client and ChatGoogleGenerativeAI all sit on thread-safe HTTP clients, so
+    the orchestrator's init pool and the request handlers can share them.
+    """
     if use_gcp and settings.google_application_credentials:
         return ChatGoogleGenerativeAI(
             model=settings.gcp_model_name,
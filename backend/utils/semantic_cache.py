@@ -0,0 +1,138 @@
+"""Semantic cache for answers to near-duplicate queries."""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-memory cache of answers keyed by query embeddings.
+
+    A lookup returns the stored value of the most similar previous query when
+    its cosine similarity reaches the threshold. Entries stored with their query
+    text can also be found by exact text, without embedding the query. Entries
+    expire after ttl_seconds, and the oldest entries are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embeddings: LangChain embeddings instance (must provide embed_query)
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Lifetime of a cached answer in seconds
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # (expires_at, unit vector, value, text), oldest first
+        self._entries: deque = deque()
+        # Exact-text index into _entries
+        self._by_text: Dict[str, tuple] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a query into a unit vector (blocking, run it off the event loop).
+
+        Args:
+            text: Query text
+
+        Returns:
+            L2-normalized embedding
+        """
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup_text(self, text: str) -> Optional[Any]:
+        """
+        Return the value cached for exactly this query text.
+
+        Args:
+            text: Normalized query text, as passed to add()
+
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            self._expire()
+            entry = self._by_text.get(text)
+            return entry[2] if entry is not None else None
+
+    def lookup(self, vector: np.ndarray) -> Optional[Any]:
+        """
+        Return the value cached for the most similar query, if similar enough.
+
+        Args:
+            vector: Unit embedding returned by embed()
+
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._matrix = np.stack([entry[1] for entry in self._entries])
+            scores = self._matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._entries[best][2]
+            return None
+
+    def add(self, vector: np.ndarray, value: Any, text: Optional[str] = None) -> None:
+        """
+        Store a value for a query embedding.
+
+        Args:
+            vector: Unit embedding returned by embed()
+            value: Value to return on later hits
+            text: Normalized query text, to also serve exact repeats via lookup_text()
+        """
+        with self._lock:
+            entry = (time.monotonic() + self.ttl_seconds, vector, value, text)
+            self._entries.append(entry)
+            if text is not None:
+                self._by_text[text] = entry
+            while len(self._entries) > self.max_entries:
+                self._pop_oldest()
+            self._matrix = None
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._by_text.clear()
+            self._matrix = None
+
+    def _expire(self) -> None:
+        """Drop expired entries (entries are ordered by expiry since the TTL is fixed)."""
+        now = time.monotonic()
+        expired = False
+        while self._entries and self._entries[0][0] <= now:
+            self._pop_oldest()
+            expired = True
+        if expired:
+            self._matrix = None
+
+    def _pop_oldest(self) -> None:
+        """Remove the oldest entry and its exact-text index (caller holds the lock)."""
+        entry = self._entries.popleft()
+        text = entry[3]
+        if text is not None and self._by_text.get(text) is entry:
+            del self._by_text[text]
@@ -20,8 +20,9 @@ interface RAGStats {
 }
 
 interface SearchResult {
+  id?: string | null
   content: string
-  full_content: string
+  full_content?: string
   metadata: any
   score: number
   source: string
@@ -260,6 +261,34 @@ export default function RAGPage() {
     }
   }
 
+  // The search only returns previews: fetch the full chunk text when a result is opened
+  const openResult = async (result: SearchResult) => {
+    setSelectedResult(result)
+    if (result.full_content || !result.id) return
+
+    try {
+      const response = await fetch(
+        `${apiUrl}/api/documents/rag/chunk/${encodeURIComponent(result.id)}`,
+        {
+          method: 'GET',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          mode: 'cors',
+          credentials: 'omit',
+        }
+      )
+      if (!response.ok) return
+
+      const data = await response.json()
+      const full = { ...result, full_content: data.content }
+      setSearchResults((results) => results.map((r) => (r === result ? full : r)))
+      setSelectedResult((current) => (current === result ? full : current))
+    } catch (err: any) {
+      console.error('Error loading chunk:', err)
+    }
+  }
+
   const handleKeyPress = (e: React.KeyboardEvent<HTMLInputElement>) => {
     if (e.key === 'Enter') {
       handleSearch()
@@ -389,7 +418,7 @@ export default function RAGPage() {
                     <div
                       key={index}
                       className="border border-gray-200 rounded-lg p-4 hover:border-primary-300 transition-colors cursor-pointer"
-                      onClick={() => setSelectedResult(result)}
+                      onClick={() => openResult(result)}
                     >
                       <div className="flex items-start justify-between">
                         <div className="flex-1">
@@ -732,7 +761,7 @@ export default function RAGPage() {
                 </div>
                 <div className="prose max-w-none mb-4">
                   <p className="text-gray-700 whitespace-pre-wrap">
-                    {selectedResult.full_content}
+                    {selectedResult.full_content ?? selectedResult.content}
                   </p>
                 </div>
                 {selectedResult.images.length > 0 && (